@@ -0,0 +1,90 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import time
+from datetime import datetime
+import helpers.redis_functions as redis_functions
+from helpers.redis_functions import add_message_to_chat, get_chat_history
+
+# Usage: python benchmarks/bench_chat_append.py [--sizes 10 100 1000 5000] [--appends 50] [--fake]
+#   Needs REDIS_URL (a disposable database - it writes bench:* sessions), or --fake for fakeredis
+
+
+def message(i: int) -> dict:
+    return {
+        "message": f"message {i} " + "lorem ipsum dolor sit amet " * 8,
+        "message_type": "user" if i % 2 == 0 else "assistant",
+        "detected_intent": "ask",
+        "created_at": datetime.utcnow().isoformat(),
+    }
+
+
+async def legacy_append(session_id: str, msg: dict):
+    """The old add_message_to_chat: GET + decode the whole blob, append, encode + SET."""
+    key = f"chat:{session_id}:messages"
+    raw = await redis_functions.async_r.get(key)
+    messages = json.loads(raw) if raw else []
+    messages.append(msg)
+    await redis_functions.async_r.set(key, json.dumps(messages))
+
+
+async def timed_appends(append, session_id: str, appends: int) -> float:
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(appends):
+            await append(session_id, i)
+    return (time.perf_counter() - start) / appends * 1_000_000
+
+
+async def main(args):
+    if args.fake:
+        import fakeredis.aioredis
+        redis_functions.async_r = fakeredis.aioredis.FakeRedis()
+    r = redis_functions.async_r
+    # Measure the list at full length instead of the configured cap
+    redis_functions.CHAT_HISTORY_MAX_MESSAGES = max(args.sizes) + args.appends
+
+    async def list_append(session_id, i):
+        await add_message_to_chat(session_id, f"message {i}", "user", "ask")
+
+    async def blob_append(session_id, i):
+        await legacy_append(session_id, message(i))
+
+    print(f"{'history size':>12} {'list µs/append':>15} {'blob µs/append':>15} {'window read µs':>15}")
+    for size in args.sizes:
+        list_session = f"bench:list:{size}"
+        blob_session = f"bench:blob:{size}"
+        cleanup = [f"chat:{session}:{suffix}" for session in (list_session, blob_session) for suffix in ("messages", "last_activity")]
+        await r.delete(*cleanup)
+
+        # Pre-fill both layouts with `size` messages
+        history = [message(i) for i in range(size)]
+        await r.rpush(f"chat:{list_session}:messages", *[json.dumps(msg) for msg in history])
+        await r.set(f"chat:{blob_session}:messages", json.dumps(history))
+
+        list_us = await timed_appends(list_append, list_session, args.appends)
+        blob_us = await timed_appends(blob_append, blob_session, args.appends)
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(args.appends):
+                await get_chat_history(list_session, limit=args.window)
+        window_us = (time.perf_counter() - start) / args.appends * 1_000_000
+
+        print(f"{size:>12} {list_us:>15.0f} {blob_us:>15.0f} {window_us:>15.0f}")
+        await r.delete(*cleanup)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chat history append cost vs history length")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--appends", type=int, default=50)
+    parser.add_argument("--window", type=int, default=20, help="Messages read per windowed read")
+    parser.add_argument("--fake", action="store_true", help="Use in-process fakeredis instead of REDIS_URL")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,57 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+import asyncio
+from helpers.embedder import generate_embedding, generate_embeddings, agenerate_embeddings
+
+CHUNKS = 256
+CONCURRENT_CALLERS = 32
+
+# Page-sized chunks with some variety so tokenized lengths differ
+WORDS = "price discount rating cotton slim fit polo neck delivery returns warranty size colour blue".split()
+CORPUS = [
+    " ".join(WORDS[(i + j) % len(WORDS)] for j in range(40 + i % 120))
+    for i in range(CHUNKS)
+]
+
+
+def per_chunk():
+    for chunk in CORPUS:
+        generate_embedding(chunk)
+
+
+def batched(batch_size: int):
+    generate_embeddings(CORPUS, batch_size=batch_size)
+
+
+async def concurrent_callers():
+    # Every caller asks for a slice, like separate HTTP requests would
+    size = CHUNKS // CONCURRENT_CALLERS
+    await asyncio.gather(*[
+        agenerate_embeddings(CORPUS[i * size:(i + 1) * size])
+        for i in range(CONCURRENT_CALLERS)
+    ])
+
+
+def report(name: str, seconds: float):
+    print(f"{name:<32} {seconds * 1000:>9.1f} ms {CHUNKS / seconds:>9.1f} chunks/s")
+
+
+if __name__ == "__main__":
+    # Warm up the model so the first run doesn't pay for lazy init
+    generate_embeddings(CORPUS[:8])
+
+    start = time.perf_counter()
+    per_chunk()
+    report("per-chunk generate_embedding", time.perf_counter() - start)
+
+    for batch_size in (8, 32, 64):
+        start = time.perf_counter()
+        batched(batch_size)
+        report(f"generate_embeddings(bs={batch_size})", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    asyncio.run(concurrent_callers())
+    report(f"{CONCURRENT_CALLERS} async callers (coalesced)", time.perf_counter() - start)
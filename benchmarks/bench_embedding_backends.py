@@ -0,0 +1,40 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+import numpy as np
+from core.config import EMBEDDING_ONNX_DIR
+from helpers.embedding_backends import create_backend
+from benchmarks.chunk_corpus import QUERIES, CHUNKS
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+BACKENDS = ["sentence_transformers", "onnx", "onnx_int8"]
+
+
+if __name__ == "__main__":
+    print(f"{'backend':<22} {'load ms':>9} {'chunks/s':>10} {'query p50 ms':>13} {'query p95 ms':>13}")
+    for kind in BACKENDS:
+        try:
+            start = time.perf_counter()
+            backend = create_backend(kind, MODEL_NAME, EMBEDDING_ONNX_DIR)
+            backend.encode(["warm up"])
+            load_ms = (time.perf_counter() - start) * 1000
+        except ImportError as e:
+            print(f"{kind:<22} skipped: {e}")
+            continue
+
+        # Throughput: the whole chunk corpus, batched like index_current_page does
+        start = time.perf_counter()
+        backend.encode(CHUNKS, batch_size=32)
+        throughput = len(CHUNKS) / (time.perf_counter() - start)
+
+        # Latency: single short queries, like the query embedding on every /query
+        latencies = []
+        for _ in range(5):
+            for query in QUERIES:
+                start = time.perf_counter()
+                backend.encode([query])
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        print(f"{kind:<22} {load_ms:>9.0f} {throughput:>10.1f} {np.percentile(latencies, 50):>13.2f} {np.percentile(latencies, 95):>13.2f}")
@@ -0,0 +1,135 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import contextlib
+import glob
+import hashlib
+import io
+import time
+import tracemalloc
+from urllib.parse import urlsplit
+import numpy as np
+from bs4 import BeautifulSoup
+from helpers.html_extract import available_backends
+from helpers.web_scrapper import parse_page
+
+# Usage: python benchmarks/bench_html_extract.py [--fixtures DIR] [--repeat 5] [--synthetic 20]
+#        python benchmarks/bench_html_extract.py --save https://www.amazon.in/dp/... https://www.flipkart.com/...
+#   Times parse_page(full_page=True) per parser backend over saved product pages, plus its peak memory.
+#   Retailer pages aren't checked in (see .gitignore) - save some with --save first. Without any,
+#   synthetic product pages are used, which only show relative numbers.
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "html")
+
+
+def save_fixtures(urls, fixtures_dir: str):
+    from helpers.http_client import fetch
+
+    os.makedirs(fixtures_dir, exist_ok=True)
+    for url in urls:
+        response = fetch(url)
+        response.raise_for_status()
+        name = f"{urlsplit(url).hostname}-{hashlib.md5(url.encode()).hexdigest()[:8]}.html"
+        with open(os.path.join(fixtures_dir, name), "w", encoding="utf-8") as f:
+            f.write(response.text)
+        print(f"saved {url} -> {name} ({len(response.text) / 1024:.0f} KiB)")
+
+
+def synthetic_page(seed: int) -> str:
+    """A product page shaped like the big retailers': nav, inline scripts, product block, reviews."""
+    rng = np.random.default_rng(seed)
+    words = ["cotton", "slim", "fit", "denim", "men", "blue", "stretch", "casual", "washed", "regular", "jeans", "size"]
+
+    def sentence(n):
+        return " ".join(rng.choice(words, n))
+
+    nav = "".join(f'<li class="nav-item"><a href="/c/{i}">{sentence(2)}</a></li>' for i in range(150))
+    scripts = "".join(f'<script>window.__state{i} = {{"price": "₹ {rng.integers(500, 5000)}", "sku": "{i}"}};</script>' for i in range(20))
+    bullets = "".join(f"<li><span class=\"a-list-item\">{sentence(12)}</span></li>" for _ in range(8))
+    reviews = "".join(
+        f'<div class="review"><span class="a-icon-alt">{rng.integers(1, 6)}.0 out of 5 stars</span>'
+        f'<h4>{sentence(4)}</h4><p>{sentence(40)}</p><p>{sentence(25)} &amp; more</p></div>'
+        for _ in range(60)
+    )
+    return (
+        f"<!DOCTYPE html><html><head><title>{sentence(6)}</title><style>.a{{color:red}}</style>{scripts}</head><body>"
+        f'<header><ul class="nav">{nav}</ul></header><div id="dp"><h1><span id="productTitle"> {sentence(10)} </span></h1>'
+        f'<span class="a-price"><span class="a-price-symbol">₹</span><span class="a-price-whole">{rng.integers(500, 5000)}</span></span>'
+        f'<span class="savingsPercentage">-{rng.integers(5, 70)}%</span><span class="a-text-price">M.R.P: ₹{rng.integers(5000, 9000)}</span>'
+        f'<span id="acrCustomerReviewText">{rng.integers(10, 9000)} ratings</span><div id="availability"> In stock </div>'
+        f'<div id="feature-bullets"><ul>{bullets}</ul></div><div id="productDescription"><p>{sentence(80)}</p></div>'
+        f"<!-- recommendations -->{reviews}</div><footer><p>{sentence(20)}<br>{sentence(10)}</p></footer></body></html>"
+    )
+
+
+def load_pages(fixtures_dir: str, synthetic: int):
+    paths = sorted(glob.glob(os.path.join(fixtures_dir, "*.html")))
+    if paths:
+        pages = []
+        for path in paths:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                pages.append((os.path.basename(path), f.read()))
+        return pages
+    print(f"No fixtures in {fixtures_dir}, using {synthetic} synthetic pages\n")
+    return [(f"synthetic-{i}", synthetic_page(i)) for i in range(synthetic)]
+
+
+def soup_baseline(html: str):
+    """Only the parse + one get_text of the previous BeautifulSoup implementation - a lower bound of its cost."""
+    return BeautifulSoup(html, "html.parser").get_text(separator=" ", strip=True)
+
+
+def measure(fn, pages, repeat: int):
+    """Per-page median time (ms) and peak traced memory (KiB)."""
+    times, peaks = [], []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _, html in pages:
+            fn(html)  # warm up
+            runs = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                fn(html)
+                runs.append((time.perf_counter() - start) * 1000)
+            times.append(np.median(runs))
+
+            tracemalloc.start()
+            fn(html)
+            peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+            tracemalloc.stop()
+    return np.array(times), np.array(peaks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="Directory of saved *.html product pages")
+    parser.add_argument("--save", nargs="+", metavar="URL", help="Fetch these pages into --fixtures and exit")
+    parser.add_argument("--synthetic", type=int, default=20, help="Synthetic pages to use when there are no fixtures")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.save:
+        save_fixtures(args.save, args.fixtures)
+        sys.exit(0)
+
+    pages = load_pages(args.fixtures, args.synthetic)
+    sizes = np.array([len(html) / 1024 for _, html in pages])
+    print(f"{len(pages)} pages, {sizes.mean():.0f} KiB on average\n")
+
+    reference = None
+    print(f"{'backend':<28} {'p50 ms':>8} {'p95 ms':>8} {'peak KiB p50':>13} {'peak KiB max':>13} {'same chunks':>12}")
+    candidates = [(kind, lambda html, kind=kind: parse_page(html, full_page=True, backend=kind)) for kind in available_backends()]
+    candidates.append(("bs4 parse+get_text only", soup_baseline))
+    for name, fn in candidates:
+        times, peaks = measure(fn, pages, args.repeat)
+        same = "-"
+        if fn is not soup_baseline:
+            with contextlib.redirect_stdout(io.StringIO()):
+                outputs = [fn(html) for _, html in pages]
+            reference = reference or outputs
+            same = f"{sum(a == b for a, b in zip(outputs, reference))}/{len(pages)}"
+        print(
+            f"{name:<28} {np.percentile(times, 50):>8.2f} {np.percentile(times, 95):>8.2f} "
+            f"{np.percentile(peaks, 50):>13.0f} {peaks.max():>13.0f} {same:>12}"
+        )
@@ -0,0 +1,50 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+import numpy as np
+from helpers.vector_index import VectorIndex
+
+VECTOR_DIM = 384
+SIZES = [1_000, 10_000, 100_000]
+QUERIES = 50
+
+
+def per_row_search(vectors: np.ndarray, urls: list, query: np.ndarray, top_k: int):
+    """The old search_similar scoring loop, minus the per-key HGETALL round trips."""
+    query_norm = np.linalg.norm(query)
+    similarities = []
+    for url, vector in zip(urls, vectors):
+        similarity = np.dot(query, vector) / (query_norm * np.linalg.norm(vector))
+        similarities.append((url, float(similarity)))
+    similarities.sort(key=lambda x: x[1], reverse=True)
+    return similarities[:top_k]
+
+
+def timed(fn, queries):
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    queries = rng.standard_normal((QUERIES, VECTOR_DIM)).astype(np.float32)
+
+    print(f"{'products':>10} {'load ms':>10} {'matrix ms/q':>12} {'per-row ms/q':>13}")
+    for size in SIZES:
+        vectors = rng.standard_normal((size, VECTOR_DIM)).astype(np.float32)
+        urls = [f"https://example.com/p/{i}" for i in range(size)]
+
+        index = VectorIndex(VECTOR_DIM)
+        start = time.perf_counter()
+        index.add_many([f"doc:{i}" for i in range(size)], urls, vectors)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        matrix_ms = timed(lambda q: index.search(q, 10), queries)
+        # The Python loop gets slow quickly; a few queries are enough to see the trend
+        loop_ms = timed(lambda q: per_row_search(vectors, urls, q, 10), queries[:3])
+
+        print(f"{size:>10} {load_ms:>10.1f} {matrix_ms:>12.3f} {loop_ms:>13.1f}")
@@ -0,0 +1,33 @@
+# Fixed chunk corpus shared by the embedding parity check and backend benchmark.
+# Short queries plus page-sized chunks, shaped like what web_scrapper produces.
+
+QUERIES = [
+    "what is the price",
+    "is this in stock",
+    "what's the discount on this",
+    "show me similar shoes",
+    "does this shirt come in blue",
+    "how many reviews does it have",
+    "is cash on delivery available",
+    "what material is this made of",
+]
+
+PRODUCT_LINES = [
+    "PRODUCT TITLE: Men Blue Textured Polo Neck T-Shirt",
+    "PRICE: ₹1,299 | MRP: ₹2,199 | DISCOUNT: 41% off",
+    "RATING: 4.3 out of 5 stars | REVIEWS: 2,417 ratings",
+    "FEATURES: 100% cotton, slim fit, short sleeves, machine wash, ribbed collar",
+    "AVAILABILITY: In stock. Usually dispatched within 24 hours.",
+    "DESCRIPTION: A breathable everyday polo with a textured weave and contrast tipping.",
+    "Free delivery on orders above ₹499. Easy 30 day returns and exchanges.",
+    "Customers also viewed: running shoes, denim jeans, leather belts, casual sneakers.",
+    "Sold by RetailNet and fulfilled by the marketplace. 7 days replacement policy.",
+    "Size chart: S 38in, M 40in, L 42in, XL 44in chest. Model wears size M.",
+]
+
+CHUNKS = [
+    " | ".join(PRODUCT_LINES[(i + j) % len(PRODUCT_LINES)] for j in range(1 + i % 6))[:1000]
+    for i in range(120)
+]
+
+CORPUS = QUERIES + CHUNKS
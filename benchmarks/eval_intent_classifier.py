@@ -0,0 +1,138 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+from helpers.intent_classifier import classify_by_rules, centroid_classifier
+from helpers.intent_detection import intent_detection
+
+# Usage: python benchmarks/eval_intent_classifier.py [--queries file.txt] [--labels labels.jsonl]
+#   --queries: one query per line (defaults to the built-in set below)
+#   --labels:  JSONL cache of LLM labels ({"query", "intent", "scope"}); missing ones are fetched
+#              from Gemini and appended, so re-runs and threshold sweeps don't pay for the LLM again
+
+# Held-out queries, deliberately not copied from prompts/intent_exemplars.py
+QUERIES = [
+    "what's the price",
+    "how much is this",
+    "is this available in size 9",
+    "does it have good reviews",
+    "what colours does this come in",
+    "is there any discount",
+    "tell me about the warranty",
+    "what is this made of",
+    "can I wash this in a machine",
+    "show me similar shoes",
+    "find me a cheaper phone",
+    "search for cotton bedsheets",
+    "I need running shoes for flat feet",
+    "show me some gaming laptops",
+    "recommend a gift for my father",
+    "any alternatives from other brands",
+    "tell me more about those shoes you showed",
+    "which one you suggested had the best rating",
+    "compare the first two",
+    "what did you recommend earlier",
+    "are they waterproof",
+    "add this to my cart",
+    "put 3 of these in my bag",
+    "remove the shirt from my cart",
+    "add to wishlist",
+    "save it for later",
+    "track my order",
+    "cancel my last order",
+    "I want to return my order",
+    "change my delivery address",
+    "reset my password",
+    "tell me more",
+    "ok thanks",
+    "hmm what",
+    "help",
+]
+
+
+def load_labels(path):
+    labels = {}
+    if path and os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    labels[item["query"]] = (item["intent"], item["scope"])
+    return labels
+
+
+async def llm_labels(queries, path):
+    labels = load_labels(path)
+    missing = [query for query in queries if query not in labels]
+    for query in missing:
+        result = await intent_detection(query, allow_local=False)
+        labels[query] = (result.intent, result.scope)
+        if path:
+            with open(path, "a") as f:
+                f.write(json.dumps({"query": query, "intent": result.intent, "scope": result.scope}) + "\n")
+    if missing:
+        print(f"[LOG] Fetched {len(missing)} LLM labels")
+    return labels
+
+
+def report(name, decisions, labels, total):
+    """decisions: {query: (intent, scope)} for the queries the tier answered."""
+    agreed = sum(1 for query, label in decisions.items() if labels[query] == label)
+    coverage = len(decisions) / total if total else 0
+    agreement = agreed / len(decisions) if decisions else 0
+    print(f"{name:<32} {len(decisions):>8} {coverage:>9.1%} {agreement:>10.1%}")
+
+
+async def main(args):
+    if args.queries:
+        with open(args.queries) as f:
+            queries = [line.strip() for line in f if line.strip()]
+    else:
+        queries = QUERIES
+
+    labels = await llm_labels(queries, args.labels)
+
+    rule_decisions = {}
+    ranked = {}
+    for query in queries:
+        rule = classify_by_rules(query)
+        if rule:
+            rule_decisions[query] = (rule.intent, rule.scope)
+        else:
+            ranked[query] = await centroid_classifier.scores(query)
+
+    print(f"[EVAL] {len(queries)} queries, agreement is measured against Gemini's labels\n")
+    print(f"{'tier':<32} {'answered':>8} {'coverage':>9} {'agreement':>10}")
+    report("rules", rule_decisions, labels, len(queries))
+
+    # Sweep centroid thresholds over the queries the rules left to it
+    for min_similarity in args.similarities:
+        centroid_decisions = {}
+        for query, scores in ranked.items():
+            (intent, scope), best = scores[0]
+            runner_up = scores[1][1] if len(scores) > 1 else -1.0
+            if best >= min_similarity and best - runner_up >= args.min_margin:
+                centroid_decisions[query] = (intent, scope)
+        combined = {**rule_decisions, **centroid_decisions}
+        print("")
+        report(f"centroid (sim>={min_similarity:.2f})", centroid_decisions, labels, len(queries))
+        report("rules + centroid", combined, labels, len(queries))
+        print(f"LLM calls avoided: {len(combined) / len(queries):.1%}")
+
+        if args.verbose:
+            for query, label in combined.items():
+                if labels[query] != label:
+                    print(f"  ✗ {query!r}: local={label} llm={labels[query]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the local intent classifier with the Gemini intent detector")
+    parser.add_argument("--queries", default=None)
+    parser.add_argument("--labels", default=None)
+    parser.add_argument("--similarities", type=float, nargs="+", default=[0.5, 0.6, 0.7])
+    parser.add_argument("--min-margin", type=float, default=0.05)
+    parser.add_argument("--verbose", action="store_true", help="Print disagreements")
+    asyncio.run(main(parser.parse_args()))
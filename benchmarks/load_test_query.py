@@ -0,0 +1,64 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import time
+import httpx
+import numpy as np
+
+# Fires concurrent POST /query requests at one running worker and reports throughput.
+# Run it against a checkout before and after a change to compare, e.g.:
+#   python benchmarks/load_test_query.py --session-id <id> --user-id <wallet> --concurrency 16 --requests 64
+
+QUERIES = ["what is the price", "is this in stock", "what's the discount", "what material is this made of"]
+
+
+async def worker(client: httpx.AsyncClient, args, queue: asyncio.Queue, latencies: list, errors: list):
+    while True:
+        try:
+            i = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        start = time.perf_counter()
+        try:
+            response = await client.post(
+                f"{args.url}/query",
+                params={"session_id": args.session_id},
+                headers={"Authorization": args.user_id},
+                json={"user_query": QUERIES[i % len(QUERIES)]},
+            )
+            if response.status_code != 200:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def main(args):
+    queue = asyncio.Queue()
+    for i in range(args.requests):
+        queue.put_nowait(i)
+
+    latencies, errors = [], []
+    async with httpx.AsyncClient(timeout=args.timeout) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[worker(client, args, queue, latencies, errors) for _ in range(args.concurrency)])
+        elapsed = time.perf_counter() - start
+
+    print(f"[LOAD] {args.requests} requests, concurrency {args.concurrency}, {elapsed:.1f} s")
+    print(f"[LOAD] throughput: {args.requests / elapsed:.2f} req/s")
+    print(f"[LOAD] latency p50 {np.percentile(latencies, 50):.0f} ms, p95 {np.percentile(latencies, 95):.0f} ms, max {max(latencies):.0f} ms")
+    print(f"[LOAD] errors: {len(errors)} {sorted(set(map(str, errors)))}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent /query load test")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--session-id", required=True)
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=120)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,88 @@
+import sys
+import os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+import argparse
+import subprocess
+import time
+
+# Usage: python benchmarks/startup_report.py [--top 15] [--target-ms 1500] [--with-model]
+
+
+PROJECT_PACKAGES = ("main", "cases", "context_retrivers", "controllers", "core", "dependencies", "helpers", "prompts", "routes")
+
+
+def import_times(module: str):
+    """
+    Import `module` in a fresh interpreter with -X importtime.
+
+    Returns:
+        (total_ms, [(package, self_ms)], [(project_module, cumulative_ms)]) where
+        self time is summed per top-level package so nothing is counted twice
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        raise SystemExit(f"[ERROR] Importing {module} failed")
+
+    packages = {}
+    project_modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            self_ms = int(self_us.strip()) / 1000
+            cumulative_ms = int(cumulative_us.strip()) / 1000
+        except ValueError:
+            continue  # header line
+        name = name.strip()
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_ms
+        if package in PROJECT_PACKAGES:
+            project_modules.append((name, cumulative_ms))
+
+    total_ms = sum(packages.values())
+    return (
+        total_ms,
+        sorted(packages.items(), key=lambda x: x[1], reverse=True),
+        sorted(project_modules, key=lambda x: x[1], reverse=True),
+    )
+
+
+def model_load_ms() -> float:
+    start = time.perf_counter()
+    from helpers.embedder import warm_up
+    warm_up()
+    return (time.perf_counter() - start) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report per-module import cost of the API process")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--target-ms", type=float, default=None, help="Fail if import time exceeds this")
+    parser.add_argument("--with-model", action="store_true", help="Also time the embedding model load")
+    args = parser.parse_args()
+
+    total_ms, packages, project_modules = import_times(args.module)
+
+    print(f"[STARTUP] import {args.module}: {total_ms:.0f} ms")
+    print(f"\n{'package (self time)':<40} {'ms':>10}")
+    for package, ms in packages[:args.top]:
+        print(f"{package:<40} {ms:>10.1f}")
+
+    print(f"\n{'project module (cumulative)':<40} {'ms':>10}")
+    for name, ms in project_modules[:args.top]:
+        print(f"{name:<40} {ms:>10.1f}")
+
+    if args.with_model:
+        print(f"[STARTUP] embedding model load + first forward pass: {model_load_ms():.0f} ms")
+
+    if args.target_ms is not None and total_ms > args.target_ms:
+        print(f"[STARTUP] ✗ Over target by {total_ms - args.target_ms:.0f} ms")
+        sys.exit(1)
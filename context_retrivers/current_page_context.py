@@ -1,13 +1,85 @@
 import sys
 import os
+import asyncio
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from helpers.web_scrapper import web_scrapper
-from helpers.embedder import generate_embedding
-from helpers.redis_functions import store_page_vector, get_relevant_content
+from helpers.embedder import agenerate_embedding, agenerate_embeddings
+from helpers.redis_functions import (
+    store_page_vector,
+    get_relevant_content,
+    get_page_meta,
+    store_page_meta,
+    delete_page_vectors,
+    page_fingerprint,
+)
 
 
-def current_page_context(url: str, query: str):
+async def index_current_page(url: str) -> bool:
+    """
+    Make sure the page's chunks are in Redis, scraping and embedding only when needed.
+
+    - Fresh page (inside its TTL, all chunks present): nothing to do
+    - Stale page whose content fingerprint is unchanged: just bump scraped_at
+    - New or changed page: drop old chunks, embed and store the new ones
+
+    Returns:
+        True if the page has indexed chunks to retrieve from
+    """
+    meta = await get_page_meta(url)
+    if meta and meta["fresh"]:
+        print(f"[CONTEXT] ✓ Page already indexed ({meta['chunk_count']} chunks), skipping scrape")
+        return True
+
+    print("[CONTEXT] Step 1: Calling web scraper...")
+    try:
+        chunks = await web_scrapper(url, full_page=True)
+    except Exception as e:
+        if meta and meta["indexed_chunks"] > 0:
+            print(f"[CONTEXT] ⚠ Re-scrape failed ({e}), serving stale index")
+            return True
+        raise
+
+    if not chunks or len(chunks) == 0:
+        print("[CONTEXT] ✗✗✗ Step 1 FAILED: No chunks retrieved from webpage")
+        return False
+    
+    print(f"[CONTEXT] ✓ Step 1 SUCCESS: Retrieved {len(chunks)} chunks")
+    # Chunks are stored under a hash of their text, so repeated ones (nav links, footers)
+    # would collapse into one key and leave indexed_chunks short of chunk_count forever
+    chunks = list(dict.fromkeys(chunks))
+
+    fingerprint = page_fingerprint(chunks)
+    if meta and meta["fingerprint"] == fingerprint and meta["indexed_chunks"] >= meta["chunk_count"]:
+        print("[CONTEXT] ✓ Page content unchanged since last scrape, skipping re-embedding")
+        await store_page_meta(url, fingerprint, meta["chunk_count"])
+        return True
+
+    if meta:
+        # Content changed - old chunks would pollute retrieval
+        await delete_page_vectors(url)
+    
+    print(f"[CONTEXT] Step 2: Processing embeddings and storing in Redis...")
+    try:
+        embeddings = await agenerate_embeddings(chunks)
+    except Exception as e:
+        print(f"[CONTEXT] ✗ Failed to embed chunks: {e}")
+        return False
+
+    results = await asyncio.gather(*[
+        store_page_vector(url, chunk, embedding)
+        for chunk, embedding in zip(chunks, embeddings)
+    ], return_exceptions=True)
+    stored_count = sum(1 for result in results if isinstance(result, dict) and result.get("status") == "success")
+    
+    print(f"[CONTEXT] ✓ Step 2 SUCCESS: Stored {stored_count}/{len(chunks)} chunks in Redis")
+
+    if stored_count:
+        await store_page_meta(url, fingerprint, stored_count)
+    return stored_count > 0
+
+
+async def current_page_context(url: str, query: str):
     try:
         print(f"\n{'='*80}")
         print(f"[CONTEXT] Starting context retrieval")
@@ -15,37 +87,25 @@ def current_page_context(url: str, query: str):
         print(f"[CONTEXT] Query: {query}")
         print(f"{'='*80}\n")
         
-        print("[CONTEXT] Step 1: Calling web scraper...")
-        chunks = web_scrapper(url, full_page=True)
+        # The query embedding doesn't depend on the page - compute it while indexing
+        query_embedding_task = asyncio.create_task(agenerate_embedding(query))
+        try:
+            indexed = await index_current_page(url)
+        except BaseException:
+            query_embedding_task.cancel()
+            raise
         
-        if not chunks or len(chunks) == 0:
-            print("[CONTEXT] ✗✗✗ Step 1 FAILED: No chunks retrieved from webpage")
+        if not indexed:
+            query_embedding_task.cancel()
             print("[CONTEXT] Returning empty [] (will trigger fallback in asking.py)")
             return []
         
-        print(f"[CONTEXT] ✓ Step 1 SUCCESS: Retrieved {len(chunks)} chunks")
-        
-        print(f"[CONTEXT] Step 2: Processing embeddings and storing in Redis...")
-        stored_count = 0
-        for i, chunk in enumerate(chunks):
-            try:
-                embedding = generate_embedding(chunk)
-                result = store_page_vector(url, chunk, embedding)
-                stored_count += 1
-                if (i + 1) % 5 == 0:  # Log every 5 chunks
-                    print(f"[CONTEXT] Processed {i+1}/{len(chunks)} chunks...")
-            except Exception as e:
-                print(f"[CONTEXT] ✗ Failed to process chunk {i+1}: {e}")
-                continue
-        
-        print(f"[CONTEXT] ✓ Step 2 SUCCESS: Stored {stored_count}/{len(chunks)} chunks in Redis")
-        
-        print("[CONTEXT] Step 3: Generating query embedding...")
-        query_embedding = generate_embedding(query)
+        print("[CONTEXT] Step 3: Waiting for query embedding...")
+        query_embedding = await query_embedding_task
         print("[CONTEXT] ✓ Step 3 SUCCESS: Query embedding generated")
         
         print("[CONTEXT] Step 4: Searching Redis for relevant content...")
-        content = get_relevant_content(url, query_embedding, top_k=5)
+        content = await get_relevant_content(url, query_embedding, top_k=5)
         
         if content and len(content) > 0:
             print(f"[CONTEXT] ✓✓✓ Step 4 SUCCESS: Found {len(content)} relevant chunks")
@@ -65,6 +125,6 @@ def current_page_context(url: str, query: str):
 
 if __name__ == "__main__":
     print("[INFO] Running current_page_context test")
-    content = current_page_context("https://allensolly.abfrl.in/p/men-blue-textured-polo-neck-t-shirt-39871258.html", "What is this product about?")
+    content = asyncio.run(current_page_context("https://allensolly.abfrl.in/p/men-blue-textured-polo-neck-t-shirt-39871258.html", "What is this product about?"))
     print("[RESULT] Relevant content:")
     print(content)
\ No newline at end of file
@@ -1,15 +1,71 @@
 import sys
 import os
+import asyncio
+import time
+from urllib.parse import urlsplit
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
-from helpers.get_product_urls import browser
+from helpers.get_product_urls import abrowser
 from helpers.web_scrapper import web_scrapper
-from helpers.embedder import generate_embedding
-from helpers.redis_functions import store_vector, search_similar, create_redis_index
+from helpers.embedder import agenerate_embedding, agenerate_embeddings
+from helpers.redis_functions import store_vectors, search_similar, create_redis_index
+from helpers import metrics
+from core.config import PRODUCT_SCRAPE_CONCURRENCY, PRODUCT_SCRAPE_PER_DOMAIN, PRODUCT_SCRAPE_DEADLINE_SECONDS
 
 
-def product_recommendation(domain: str, user_query: str):
+async def scrape_products(product_urls, concurrency: int = PRODUCT_SCRAPE_CONCURRENCY,
+                          per_domain: int = PRODUCT_SCRAPE_PER_DOMAIN,
+                          deadline: float = PRODUCT_SCRAPE_DEADLINE_SECONDS):
+    """
+    Scrape product pages concurrently, at most `concurrency` at once and `per_domain` per host.
+    Pages still loading when `deadline` seconds have passed are cancelled and left out.
+
+    Returns:
+        (urls, texts) for the pages that produced content, in the order of product_urls
+    """
+    overall = asyncio.Semaphore(concurrency)
+    domains = {}
+
+    async def scrape(product_url):
+        host = urlsplit(product_url).hostname or ""
+        if host not in domains:
+            domains[host] = asyncio.Semaphore(per_domain)
+        async with overall, domains[host]:
+            return await web_scrapper(product_url)
+
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(scrape(product_url)) for product_url in product_urls]
+    if not tasks:
+        return [], []
+    done, pending = await asyncio.wait(tasks, timeout=deadline)
+    for task in pending:
+        task.cancel()
+    if pending:
+        print(f"[WARNING] {len(pending)}/{len(tasks)} product pages missed the {deadline}s deadline, continuing without them")
+        metrics.incr("recommendation.scrape_timeouts", len(pending))
+        await asyncio.gather(*pending, return_exceptions=True)
+    metrics.observe("recommendation.scrape_ms", (time.perf_counter() - started) * 1000)
+
+    scraped_urls = []
+    scraped_texts = []
+    for product_url, task in zip(product_urls, tasks):
+        if task not in done:
+            continue
+        if task.exception() is not None:
+            print(f"[ERROR] Failed to process {product_url}: {task.exception()}")
+            continue
+        chunk = task.result()
+        if not chunk or len(chunk.strip()) == 0:
+            print(f"[WARNING] Empty chunk extracted from {product_url}, skipping")
+            continue
+        print(f"[LOG] Extracted chunk from {product_url}")
+        scraped_urls.append(product_url)
+        scraped_texts.append(product_url + " " + chunk)
+    return scraped_urls, scraped_texts
+
+
+async def product_recommendation(domain: str, user_query: str):
     print(f"[LOG] Starting product recommendation for query: '{user_query}' on domain: '{domain}'")
     
     # Ensure Redis index exists before storing/searching
@@ -21,7 +77,7 @@ def product_recommendation(domain: str, user_query: str):
     
     # Fetch product URLs
     try:
-        browser_result = browser(user_query, domain, 10)
+        browser_result = await abrowser(user_query, domain, 10)
         if not browser_result.get("success") or not browser_result.get("urls"):
             print(f"[WARNING] No products found from browser")
             list_of_products = []
@@ -32,36 +88,29 @@ def product_recommendation(domain: str, user_query: str):
         print(f"[ERROR] Browser search failed: {e}")
         return set()
     
-    # Process and store products
-    for idx, product_url in enumerate(list_of_products, 1):
-        print(f"[LOG] Processing product {idx}/{len(list_of_products)}: {product_url}")
+    # Scrape products concurrently, embed them all in one batch, store them in one pipeline
+    scraped_urls, scraped_texts = await scrape_products(list_of_products)
+    
+    if scraped_texts:
         try:
-            chunk = web_scrapper(product_url)
-            print(f"[LOG] Extracted chunk from {product_url}")
-            
-            if not chunk or len(chunk.strip()) == 0:
-                print(f"[WARNING] Empty chunk extracted from {product_url}, skipping")
-                continue
-            
-            print(f"[LOG] Generating embedding for chunk")
-            embedding = generate_embedding(product_url + " " + chunk)
-            print(f"[LOG] Storing vector for {product_url}")
-            result = store_vector(product_url, embedding)
+            print(f"[LOG] Generating embeddings for {len(scraped_texts)} products")
+            embeddings = await agenerate_embeddings(scraped_texts)
+            print(f"[LOG] Storing vectors for {len(embeddings)} products")
+            result = await store_vectors(scraped_urls, embeddings)
             if result.get("status") != "success":
-                print(f"[WARNING] Failed to store vector: {result.get('message')}")
+                print(f"[WARNING] Failed to store vectors: {result.get('message')}")
         except Exception as e:
-            print(f"[ERROR] Failed to process {product_url}: {e}")
-            continue
+            print(f"[ERROR] Failed to embed products: {e}")
     
     # Search for similar products
     try:
         print(f"[LOG] Generating embedding for user query: '{user_query}'")
-        query_embedding = generate_embedding(user_query)
+        query_embedding = await agenerate_embedding(user_query)
         
         # Note: Requesting top 10 but only stored 4 new products
         # This may return old/unrelated products from Redis if they exist
         print(f"[LOG] Searching for similar products (top 10)")
-        similar_products = search_similar(query_embedding, 10)
+        similar_products = await search_similar(query_embedding, 10)
         print(f"[LOG] Found {len(similar_products)} similar products")
         
         # Use generator expression instead of list comprehension in set()
@@ -76,5 +125,5 @@ def product_recommendation(domain: str, user_query: str):
 
 
 # if __name__ == "__main__":
-#     result = product_recommendation("allensolly.abfrl.in", "Blue Jeans for men")
+#     result = asyncio.run(product_recommendation("allensolly.abfrl.in", "Blue Jeans for men"))
 #     print(result)
\ No newline at end of file
@@ -1,13 +1,11 @@
 from fastapi import Request
 from fastapi.responses import JSONResponse
-from prisma import Prisma
+from core.database import prisma
+from helpers.auth_cache import invalidate_user
 import json
 
-prisma = Prisma()
 
 async def AuthenticateUser(req: Request):
-    if not prisma.is_connected():
-        await prisma.connect()
     try:
         walletAddress = req.path_params.get("walletAddress")
 
@@ -82,8 +80,6 @@ async def AuthenticateUser(req: Request):
 
 
 async def CreateUser(req: Request):
-    if not prisma.is_connected():
-        await prisma.connect()
     try:
         body = await req.json()
         walletAddress = req.path_params.get("walletAddress")
@@ -184,6 +180,8 @@ async def CreateUser(req: Request):
         newUser = await prisma.users.create(
             data=create_data,
         )
+        # Drop any cached "no such user" entry for this wallet
+        await invalidate_user(normalizedWalletAddress)
 
         user_data = {
             "id": newUser.id,
@@ -1,9 +1,35 @@
+import asyncio
+import json
+import time
 from fastapi import Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from helpers.intent_detection import intent_detection
-from cases.asking import asking
+from cases.asking import asking, stream_asking
 from helpers.get_session_details import get_session_details
-from helpers.add_chats import add_chats
+from helpers.chat_writer import chat_writer
+from helpers.context_builder import build_chat_context
+from helpers.web_scrapper import is_scrapable
+from helpers import metrics
+from helpers.embedder import agenerate_embedding
+from helpers.answer_cache import lookup_answer, store_answer
+from core.config import ANSWER_CACHE
+from context_retrivers.current_page_context import current_page_context
+
+# Scopes whose answers never look at the current page
+PAGE_INDEPENDENT_SCOPES = ("product", "chat_history")
+
+
+async def cancel_task(task: asyncio.Task):
+    """Cancel a background task and wait for it to unwind."""
+    if task.done():
+        return
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        pass
+
 
 async def query_handler(request: Request):
     try:
@@ -26,35 +52,76 @@ async def query_handler(request: Request):
         if not current_page_url:
             return JSONResponse(content={"message": "Current page URL not found in session"}, status_code=400)
 
+        # Most queries end up on the current page, so start scraping/indexing it and
+        # embedding the query while intent detection is still waiting on Gemini
+        prefetch = None
+        if is_scrapable(current_page_url):
+            prefetch = asyncio.create_task(current_page_context(current_page_url, user_query))
+        
         # Detect intent
-        intent = intent_detection(user_query)
+        try:
+            intent = await intent_detection(user_query)
+        except BaseException:
+            if prefetch:
+                await cancel_task(prefetch)
+            raise
         print(f"[LOG] Detected intent: {intent.intent}, scope: {intent.scope}, message_forward: {intent.message_forward}")
         
         # Process based on intent - ALWAYS handle intelligently
         answer = None
         res = None
+        cached = None
+        # Clients can opt out per request with {"use_cache": false}
+        use_answer_cache = ANSWER_CACHE == "on" and body.get("use_cache", True) is not False and prefetch is not None
         
-        # Determine the best handling approach
-        chat_history = "\n".join([f"{msg.get('message_type')}: {msg.get('message')}" for msg in session_details.get("chat_messages")])
+        # Near-identical questions about the same page content reuse the earlier answer
+        if use_answer_cache and intent.scope == "current_page":
+            query_embedding = await agenerate_embedding(user_query)
+            cached = await lookup_answer(current_page_url, intent.scope, query_embedding)
+            if cached:
+                print(f"[LOG] Answer cache hit ({cached['similarity']:.3f}) for: {cached['query']}")
+                await cancel_task(prefetch)
+                prefetch = None
         
+        page_context = None
+        if prefetch:
+            if intent.scope in PAGE_INDEPENDENT_SCOPES:
+                await cancel_task(prefetch)
+                metrics.incr("query.prefetch_discarded")
+            else:
+                page_context = await prefetch
+                metrics.incr("query.prefetch_used")
+        
+        # Only chat_history answers read the conversation - building it costs Redis round trips
+        # and may start a summary update, so the other scopes and cache hits skip it
+        chat_history = None
+        if not cached and intent.scope == "chat_history":
+            chat_history = await build_chat_context(session_id, session_details.get("chat_messages"), user_query)
+        
+        if cached:
+            answer = cached["answer"]
         # For current_page scope, always use current_page_asking for context-aware responses
-        if intent.scope == "current_page":
+        elif intent.scope == "current_page":
             print(f"[LOG] Processing '{intent.intent}' intent with scope: current_page")
             from cases.asking import current_page_asking
             # Use the ORIGINAL user query, not the modified message_forward
-            answer = current_page_asking(user_query, current_page_url)
+            answer = await current_page_asking(user_query, current_page_url, page_context)
+            # Only answers grounded in indexed chunks are worth reusing
+            if use_answer_cache and answer and page_context:
+                await store_answer(current_page_url, intent.scope, user_query, query_embedding, answer)
         else:
             # For other scopes, use the general asking function
             print(f"[LOG] Processing '{intent.intent}' intent with scope: {intent.scope}")
-            answer = asking(user_query, domain, current_page_url, intent.scope, session_id, chat_history)
+            answer = await asking(user_query, domain, current_page_url, intent.scope, session_id, chat_history, page_context)
         
         print(f"[LOG] Got answer: {answer[:100] if answer else 'None'}...")
-        res = JSONResponse(content={"answer": answer}, status_code=200)
+        res = JSONResponse(content={"answer": answer, "cached": bool(cached)}, status_code=200)
     
-        # Add messages to both DB and Redis
-        await add_chats(session_id, user_query, "user", intent.intent, user_id)
+        # Saved to DB and Redis in the background, after the response is released
+        turn = [(user_query, "user")]
         if answer:
-            await add_chats(session_id, answer, "assistant", intent.intent, user_id)
+            turn.append((answer, "assistant"))
+        chat_writer.enqueue(session_id, user_id, intent.intent, turn)
         
         return res
     
@@ -72,3 +139,135 @@ async def query_handler(request: Request):
         traceback.print_exc()
         return JSONResponse(content={"message": "Internal server error", "error": str(e)}, status_code=500)
 
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def persist_streamed_answer(state: dict):
+    """Runs after the stream has been fully sent, so saving never delays the first byte."""
+    if not state.get("intent"):
+        return
+    turn = [(state["user_query"], "user")]
+    if state.get("completed") and state.get("answer"):
+        turn.append((state["answer"], "assistant"))
+    chat_writer.enqueue(state["session_id"], state["user_id"], state["intent"], turn)
+
+
+async def query_stream_handler(request: Request):
+    """
+    Streaming variant of query_handler. Responds with text/event-stream:
+
+        event: intent   {"intent", "scope"}        as soon as intent detection finishes
+        event: context  {"source", "chunks"}       once page context (or a cached answer) is ready
+        event: token    {"text"}                   answer pieces as Gemini produces them
+        event: done     {"ttft_ms", "total_ms", "cached"}
+        event: error    {"message"}
+
+    Request validation errors, and failures before the stream starts, are still returned as
+    JSON with the usual status codes.
+    """
+    start = time.perf_counter()
+    try:
+        session_id = request.query_params.get("session_id")
+        body = await request.json()
+        user_id = request.headers.get("Authorization")
+        
+        if not session_id or not user_id:
+            return JSONResponse(content={"message": "Session ID or User ID is required"}, status_code=401)
+        
+        session_details = await get_session_details(session_id, user_id)
+        user_query = body.get("user_query")
+        
+        if not user_query:
+            return JSONResponse(content={"message": "User query is required"}, status_code=400)
+        
+        domain = session_details.get("current_domain")
+        current_page_url = session_details.get("current_url")
+        
+        if not current_page_url:
+            return JSONResponse(content={"message": "Current page URL not found in session"}, status_code=400)
+    except ValueError as e:
+        print(f"[ERROR] ValueError in query_stream_handler: {e}")
+        return JSONResponse(content={"message": str(e)}, status_code=400)
+    except Exception as e:
+        print(f"[ERROR] Unexpected error in query_stream_handler: {e}")
+        import traceback
+        traceback.print_exc()
+        return JSONResponse(content={"message": "Internal server error", "error": str(e)}, status_code=500)
+    
+    use_answer_cache = ANSWER_CACHE == "on" and body.get("use_cache", True) is not False and is_scrapable(current_page_url)
+    state = {"session_id": session_id, "user_id": user_id, "user_query": user_query}
+
+    prefetch = None
+    if is_scrapable(current_page_url):
+        prefetch = asyncio.create_task(current_page_context(current_page_url, user_query))
+
+    async def events():
+        nonlocal prefetch
+        ttft_ms = None
+        cached = None
+        try:
+            intent = await intent_detection(user_query)
+            state["intent"] = intent.intent
+            print(f"[LOG] Detected intent: {intent.intent}, scope: {intent.scope}")
+            yield sse_event("intent", {"intent": intent.intent, "scope": intent.scope})
+            
+            if use_answer_cache and intent.scope == "current_page":
+                query_embedding = await agenerate_embedding(user_query)
+                cached = await lookup_answer(current_page_url, intent.scope, query_embedding)
+            
+            page_context = None
+            if prefetch:
+                if cached or intent.scope in PAGE_INDEPENDENT_SCOPES:
+                    await cancel_task(prefetch)
+                    metrics.incr("query.prefetch_discarded")
+                else:
+                    page_context = await prefetch
+                    metrics.incr("query.prefetch_used")
+                prefetch = None
+            
+            chat_history = None
+            if not cached and intent.scope == "chat_history":
+                chat_history = await build_chat_context(session_id, session_details.get("chat_messages"), user_query)
+            if cached:
+                yield sse_event("context", {"source": "answer_cache", "chunks": 0})
+                pieces = [cached["answer"]]
+                ttft_ms = (time.perf_counter() - start) * 1000
+                yield sse_event("token", {"text": cached["answer"]})
+            else:
+                yield sse_event("context", {"source": intent.scope, "chunks": len(page_context) if page_context else 0})
+                pieces = []
+                async for text in stream_asking(user_query, domain, current_page_url, intent.scope, chat_history, page_context):
+                    if ttft_ms is None:
+                        ttft_ms = (time.perf_counter() - start) * 1000
+                        metrics.observe("query.ttft_ms", ttft_ms)
+                    pieces.append(text)
+                    yield sse_event("token", {"text": text})
+            
+            state["answer"] = "".join(pieces)
+            state["completed"] = True
+            if use_answer_cache and not cached and intent.scope == "current_page" and page_context and state["answer"]:
+                await store_answer(current_page_url, intent.scope, user_query, query_embedding, state["answer"])
+            
+            total_ms = (time.perf_counter() - start) * 1000
+            metrics.observe("query.stream_total_ms", total_ms)
+            yield sse_event("done", {"ttft_ms": ttft_ms, "total_ms": total_ms, "cached": bool(cached)})
+        except Exception as e:
+            print(f"[ERROR] Unexpected error in query_stream_handler: {e}")
+            import traceback
+            traceback.print_exc()
+            metrics.incr("query.stream_errors")
+            yield sse_event("error", {"message": "Internal server error"})
+        finally:
+            # Also runs when the client disconnects mid-stream
+            if prefetch:
+                await cancel_task(prefetch)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(persist_streamed_answer, state),
+    )
@@ -1,16 +1,16 @@
 # controllers/chat.py
+import base64
+import json
+from datetime import datetime
 from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
-from prisma import Prisma
-
-prisma = Prisma()
+from core.database import prisma
+from helpers.redis_functions import add_message_to_chat, cache_session
+from helpers.get_session_details import session_cache_record
 
 
 async def save_message(req: Request):
     """Save a chat message to the database"""
-    if not prisma.is_connected():
-        await prisma.connect()
-    
     try:
         # Get userId from request state (set by middleware/dependency)
         user_id = req.state.user_id
@@ -52,6 +52,14 @@ async def save_message(req: Request):
             }
         )
         
+        await prisma.chat_sessions.update_many(
+            where={"id": session_id, "user_id": user_id},
+            data={"last_activity": datetime.utcnow()}
+        )
+        
+        # Keep the Redis chat history that /query reads in sync
+        await add_message_to_chat(session_id, message, message_type, detected_intent)
+        
         return JSONResponse(
             status_code=201,
             content={
@@ -73,9 +81,6 @@ async def save_message(req: Request):
 
 async def create_session(req: Request):
     """Create a new chat session"""
-    if not prisma.is_connected():
-        await prisma.connect()
-    
     try:
         # Get userId from request state
         user_id = req.state.user_id
@@ -108,6 +113,9 @@ async def create_session(req: Request):
             }
         )
         
+        # A new session has no history, so /query can be served from Redis right away
+        await cache_session(session_cache_record(session.model_dump(mode='json')), [])
+        
         return JSONResponse(
             status_code=201,
             content={
@@ -128,9 +136,6 @@ async def create_session(req: Request):
 
 async def get_session(req: Request):
     """Get a session with its messages"""
-    if not prisma.is_connected():
-        await prisma.connect()
-    
     try:
         user_id = req.state.user_id
         
@@ -181,21 +186,145 @@ async def get_session(req: Request):
         raise HTTPException(status_code=500, detail="Internal Server error")
 
 
+SESSION_LIST_FIELDS = ("id", "user_id", "current_url", "current_domain", "created_at", "last_activity")
+SESSION_PAGE_DEFAULT = 20
+SESSION_PAGE_MAX = 100
+MESSAGE_PREVIEW_CHARS = 120
+
+
+def encode_cursor(session) -> str:
+    """Opaque keyset cursor: the (last_activity, id) of the last session on a page."""
+    position = {
+        "last_activity": session.last_activity.isoformat() if session.last_activity else None,
+        "id": session.id,
+    }
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        last_activity = position["last_activity"]
+        return {
+            "last_activity": datetime.fromisoformat(last_activity) if last_activity else None,
+            "id": position["id"],
+        }
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def after_cursor(position: dict) -> dict:
+    """
+    Sessions that come after `position` in (last_activity desc, id desc) order.
+    Postgres sorts NULL last_activity first when descending, so those come before all dated ones.
+    """
+    if position["last_activity"] is None:
+        return {"OR": [
+            {"last_activity": None, "id": {"lt": position["id"]}},
+            {"last_activity": {"not": None}},
+        ]}
+    return {"OR": [
+        {"last_activity": {"lt": position["last_activity"]}},
+        {"last_activity": position["last_activity"], "id": {"lt": position["id"]}},
+    ]}
+
+
+async def session_summaries(session_ids: list) -> dict:
+    """
+    Message count and latest message preview per session, in one query for the whole page.
+    DISTINCT ON walks the (session_id, created_at) index newest first, and the window count
+    is evaluated before DISTINCT ON drops the older rows.
+    """
+    if not session_ids:
+        return {}
+    rows = await prisma.query_raw(
+        """
+        SELECT DISTINCT ON (session_id)
+            session_id::text AS session_id,
+            LEFT(message, $2) AS message,
+            message_type::text AS message_type,
+            created_at,
+            COUNT(*) OVER (PARTITION BY session_id) AS message_count
+        FROM chat_messages
+        WHERE session_id = ANY($1::uuid[])
+        ORDER BY session_id, created_at DESC
+        """,
+        session_ids,
+        MESSAGE_PREVIEW_CHARS,
+    )
+    summaries = {session_id: {"message_count": 0, "last_message": None} for session_id in session_ids}
+    for row in rows:
+        created_at = row["created_at"]
+        summaries[row["session_id"]] = {
+            "message_count": int(row["message_count"]),
+            "last_message": {
+                "message": row["message"],
+                "message_type": row["message_type"],
+                "created_at": created_at.isoformat() if hasattr(created_at, "isoformat") else created_at,
+            },
+        }
+    return summaries
+
+
 async def get_all_sessions(req: Request):
-    """Get all sessions for a user"""
-    if not prisma.is_connected():
-        await prisma.connect()
-    
+    """
+    List a user's sessions, most recently active first, one page at a time.
+
+    Query params:
+        limit: Page size (default 20, max 100)
+        cursor: next_cursor from the previous page
+        fields: Comma-separated subset of id, user_id, current_url, current_domain, created_at, last_activity
+        summary: "true" to add message_count and a last_message preview to each session
+    """
     try:
         user_id = req.state.user_id
         
+        try:
+            limit = int(req.query_params.get("limit", SESSION_PAGE_DEFAULT))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="limit must be an integer")
+        limit = max(1, min(limit, SESSION_PAGE_MAX))
+        
+        fields = SESSION_LIST_FIELDS
+        if req.query_params.get("fields"):
+            fields = tuple(field.strip() for field in req.query_params["fields"].split(",") if field.strip())
+            unknown = [field for field in fields if field not in SESSION_LIST_FIELDS]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        summary = req.query_params.get("summary", "").lower() in ("1", "true", "yes")
+        
+        where = {"user_id": user_id}
+        cursor = req.query_params.get("cursor")
+        if cursor:
+            where = {"AND": [where, after_cursor(decode_cursor(cursor))]}
+        
+        # Served by the chat_sessions(user_id, last_activity) index; one extra row tells us if there's a next page
         sessions = await prisma.chat_sessions.find_many(
-            where={"user_id": user_id}
+            where=where,
+            order=[{"last_activity": "desc"}, {"id": "desc"}],
+            take=limit + 1,
         )
+        has_more = len(sessions) > limit
+        sessions = sessions[:limit]
+        
+        summaries = await session_summaries([session.id for session in sessions]) if summary else {}
+        
+        items = []
+        for session in sessions:
+            data = session.model_dump(mode='json', include=set(fields))
+            if summary:
+                data.update(summaries[session.id])
+            items.append(data)
         
         # Return dict directly
-        return {"sessions": [session.model_dump(mode='json') for session in sessions]}
+        return {
+            "sessions": items,
+            "next_cursor": encode_cursor(sessions[-1]) if has_more else None,
+            "has_more": has_more,
+        }
         
+    except HTTPException:
+        raise
     except Exception as error:
         print(f"Error getting sessions: {str(error)}")
-        raise HTTPException(status_code=500, detail="Internal Server error")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal Server error")
@@ -10,4 +10,119 @@ class LLMKeys:
     # Add more keys here
 
 REDIS_URL = os.getenv("REDIS_URL")
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+# Shared database client: pooled connections, seconds a query may wait for a connection,
+# seconds a single query may run, seconds to wait for the initial connect, and the longest
+# pause between reconnect attempts when the database wasn't reachable at startup
+DB_CONNECTION_LIMIT = int(os.getenv("DB_CONNECTION_LIMIT", "10"))
+DB_POOL_TIMEOUT_SECONDS = int(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+DB_STATEMENT_TIMEOUT_SECONDS = int(os.getenv("DB_STATEMENT_TIMEOUT_SECONDS", "30"))
+DB_CONNECT_TIMEOUT_SECONDS = int(os.getenv("DB_CONNECT_TIMEOUT_SECONDS", "10"))
+DB_RECONNECT_MAX_BACKOFF_SECONDS = float(os.getenv("DB_RECONNECT_MAX_BACKOFF_SECONDS", "30"))
+
+# LLM client pool: per-attempt timeout (seconds), retries and concurrent calls per model.
+# Per-model overrides look like LLM_CONCURRENCY_LIMITS="gemini-2.5-flash=8,gemini-2.5-pro=2"
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_CONCURRENCY_LIMITS = {
+    name.strip(): int(limit)
+    for name, limit in (
+        item.split("=", 1) for item in os.getenv("LLM_CONCURRENCY_LIMITS", "").split(",") if "=" in item
+    )
+}
+
+# In-process cache of per-page chunk matrices (number of URLs kept)
+PAGE_CACHE_MAX_URLS = int(os.getenv("PAGE_CACHE_MAX_URLS", "128"))
+
+# How long a scraped page counts as fresh before it is re-scraped (seconds)
+PAGE_TTL_SECONDS = int(os.getenv("PAGE_TTL_SECONDS", "900"))
+# How long page metadata is kept around to compare fingerprints on re-scrape (seconds)
+PAGE_META_RETENTION_SECONDS = int(os.getenv("PAGE_META_RETENTION_SECONDS", str(7 * 24 * 3600)))
+
+# Embedding batching: forward-pass batch size, coalescing window and worker threads
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_MAX_WAIT_MS = float(os.getenv("EMBEDDING_MAX_WAIT_MS", "5"))
+EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", "1"))
+
+# Embedding backend: "sentence_transformers" (reference), "onnx" or "onnx_int8" (CPU, quantized)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "sentence_transformers").lower()
+# Exported ONNX model + tokenizer directory (created on first use) and ONNX Runtime threads (0 = default)
+EMBEDDING_ONNX_DIR = os.getenv("EMBEDDING_ONNX_DIR", "models/all-MiniLM-L6-v2-onnx")
+EMBEDDING_ONNX_THREADS = int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))
+
+# Embedding model warm-up at startup: "off" (load on first use), "background" or "blocking"
+EMBEDDER_WARMUP = os.getenv("EMBEDDER_WARMUP", "off").lower()
+
+# Embedding cache: in-process memory cap (bytes) and Redis tier TTL (seconds)
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+EMBEDDING_CACHE_TTL_SECONDS = int(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Local intent classification before the LLM: "on" or "off". The centroid tier only answers when the
+# best cosine similarity reaches INTENT_MIN_SIMILARITY and beats the runner-up by INTENT_MIN_MARGIN
+INTENT_LOCAL_CLASSIFIER = os.getenv("INTENT_LOCAL_CLASSIFIER", "on").lower()
+INTENT_MIN_SIMILARITY = float(os.getenv("INTENT_MIN_SIMILARITY", "0.6"))
+INTENT_MIN_MARGIN = float(os.getenv("INTENT_MIN_MARGIN", "0.05"))
+
+# Semantic answer cache for current-page questions: "on" or "off", the query-embedding cosine
+# similarity needed to reuse an answer, and the max cached answers per (page content, scope)
+ANSWER_CACHE = os.getenv("ANSWER_CACHE", "on").lower()
+ANSWER_CACHE_MIN_SIMILARITY = float(os.getenv("ANSWER_CACHE_MIN_SIMILARITY", "0.92"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "50"))
+
+# Messages kept per session in the Redis chat history list (older ones are trimmed; Postgres keeps all)
+CHAT_HISTORY_MAX_MESSAGES = int(os.getenv("CHAT_HISTORY_MAX_MESSAGES", "1000"))
+# Most recent messages handed to /query as chat history, and how long a session stays cached in Redis
+CHAT_HISTORY_WINDOW = int(os.getenv("CHAT_HISTORY_WINDOW", "50"))
+SESSION_CACHE_TTL_SECONDS = int(os.getenv("SESSION_CACHE_TTL_SECONDS", str(24 * 3600)))
+# Estimated-token budget for the chat history put in prompts, the length cap of the rolling summary
+# of older turns, and how many unsummarized tokens accumulate before the summary is updated
+CHAT_CONTEXT_TOKEN_BUDGET = int(os.getenv("CHAT_CONTEXT_TOKEN_BUDGET", "1500"))
+CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "300"))
+CHAT_SUMMARY_TRIGGER_TOKENS = int(os.getenv("CHAT_SUMMARY_TRIGGER_TOKENS", "200"))
+
+# Write-behind chat persistence: max rows per create_many, how long to wait for a batch to fill,
+# insert retries before dead-lettering, queue capacity (turns) and how long shutdown waits to drain
+CHAT_WRITE_BATCH_SIZE = int(os.getenv("CHAT_WRITE_BATCH_SIZE", "100"))
+CHAT_WRITE_FLUSH_MS = float(os.getenv("CHAT_WRITE_FLUSH_MS", "50"))
+CHAT_WRITE_MAX_RETRIES = int(os.getenv("CHAT_WRITE_MAX_RETRIES", "5"))
+CHAT_WRITE_QUEUE_MAX = int(os.getenv("CHAT_WRITE_QUEUE_MAX", "10000"))
+CHAT_WRITE_DRAIN_SECONDS = float(os.getenv("CHAT_WRITE_DRAIN_SECONDS", "10"))
+
+# Authenticated-user cache: Redis TTL for known users, TTL for "no such user" entries,
+# and the in-process tier's TTL and size
+AUTH_CACHE_TTL_SECONDS = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "300"))
+AUTH_CACHE_NEGATIVE_TTL_SECONDS = int(os.getenv("AUTH_CACHE_NEGATIVE_TTL_SECONDS", "5"))
+AUTH_CACHE_LOCAL_TTL_SECONDS = int(os.getenv("AUTH_CACHE_LOCAL_TTL_SECONDS", "30"))
+AUTH_CACHE_LOCAL_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_LOCAL_MAX_ENTRIES", "10000"))
+
+# Shared HTTP fetch layer for scraping: HTTP/2 ("on" when the h2 package is installed, else "off"),
+# concurrent requests per host, pool-wide connection cap, idle keep-alive lifetime and timeouts
+HTTP_HTTP2 = os.getenv("HTTP_HTTP2", "on").lower()
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "6"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "60"))
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "15"))
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+
+# Product recommendation scraping: product pages fetched at once (overall and per domain), and the
+# deadline after which recommendations go ahead with whatever pages finished
+PRODUCT_SCRAPE_CONCURRENCY = int(os.getenv("PRODUCT_SCRAPE_CONCURRENCY", "8"))
+PRODUCT_SCRAPE_PER_DOMAIN = int(os.getenv("PRODUCT_SCRAPE_PER_DOMAIN", "4"))
+PRODUCT_SCRAPE_DEADLINE_SECONDS = float(os.getenv("PRODUCT_SCRAPE_DEADLINE_SECONDS", "8"))
+
+# Listing pages scraped at once per retailer when search finds too few product pages, and their fetch timeout
+LISTING_SCRAPE_PER_SITE = int(os.getenv("LISTING_SCRAPE_PER_SITE", "3"))
+LISTING_SCRAPE_TIMEOUT_SECONDS = float(os.getenv("LISTING_SCRAPE_TIMEOUT_SECONDS", "10"))
+
+# HTML parser for scraped pages: "auto" (fastest installed), "selectolax", "lxml" or "html.parser"
+HTML_PARSER = os.getenv("HTML_PARSER", "auto").lower()
+
+# Process pool for parsing scraped pages: worker processes (0 = parse in a thread instead), pages a
+# worker handles before it is replaced, and the page size (UTF-8 bytes) below which parsing stays in-process
+PARSE_POOL_WORKERS = int(os.getenv("PARSE_POOL_WORKERS", "2"))
+PARSE_POOL_MAX_TASKS_PER_CHILD = int(os.getenv("PARSE_POOL_MAX_TASKS_PER_CHILD", "200"))
+PARSE_POOL_MIN_BYTES = int(os.getenv("PARSE_POOL_MIN_BYTES", str(64 * 1024)))
+
 llm_keys = LLMKeys()
\ No newline at end of file
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from datetime import timedelta
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from prisma import Prisma
+from core.config import (
+    DATABASE_URL,
+    DB_CONNECTION_LIMIT,
+    DB_POOL_TIMEOUT_SECONDS,
+    DB_STATEMENT_TIMEOUT_SECONDS,
+    DB_CONNECT_TIMEOUT_SECONDS,
+    DB_RECONNECT_MAX_BACKOFF_SECONDS,
+)
+
+
+def pooled_database_url(url: str) -> str:
+    """
+    Add the query engine's pool settings to the connection string. Parameters already
+    present in DATABASE_URL win over the DB_* settings.
+
+    - connection_limit: connections in the pool
+    - pool_timeout: seconds a query may wait for a free connection
+    - socket_timeout: seconds a single query may run
+    """
+    parts = urlsplit(url)
+    params = dict(parse_qsl(parts.query))
+    params.setdefault("connection_limit", str(DB_CONNECTION_LIMIT))
+    params.setdefault("pool_timeout", str(DB_POOL_TIMEOUT_SECONDS))
+    params.setdefault("socket_timeout", str(DB_STATEMENT_TIMEOUT_SECONDS))
+    return urlunsplit(parts._replace(query=urlencode(params)))
+
+
+# The one database client of the process. main.py's lifespan connects and disconnects it.
+prisma = Prisma(
+    datasource={"url": pooled_database_url(DATABASE_URL)} if DATABASE_URL else None,
+    connect_timeout=timedelta(seconds=DB_CONNECT_TIMEOUT_SECONDS),
+)
+
+
+async def connect_db():
+    if not prisma.is_connected():
+        start = time.perf_counter()
+        await prisma.connect()
+        print(f"[LOG] Connected to the database in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+async def connect_db_with_retry():
+    """
+    Keep trying connect_db() until it succeeds, backing off exponentially up to
+    DB_RECONNECT_MAX_BACKOFF_SECONDS between attempts. Run as a background task when the
+    database isn't reachable at startup, so the process recovers once it comes up.
+    """
+    delay = 1.0
+    attempt = 1
+    while not prisma.is_connected():
+        try:
+            await connect_db()
+            return
+        except Exception as e:
+            print(f"[ERROR] Database connection attempt {attempt} failed, retrying in {delay:.0f}s: {e}")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, DB_RECONNECT_MAX_BACKOFF_SECONDS)
+        attempt += 1
+
+
+async def disconnect_db():
+    if prisma.is_connected():
+        await prisma.disconnect()
+
+
+async def db_ready() -> Dict[str, Any]:
+    """
+    Readiness check: run a trivial query through the pool.
+
+    Returns:
+        Dict with status ("ok"/"error"), latency_ms and error if any
+    """
+    start = time.perf_counter()
+    try:
+        if not prisma.is_connected():
+            return {"status": "error", "error": "not connected"}
+        await prisma.query_raw("SELECT 1")
+        return {"status": "ok", "latency_ms": round((time.perf_counter() - start) * 1000, 1)}
+    except Exception as e:
+        return {"status": "error", "latency_ms": round((time.perf_counter() - start) * 1000, 1), "error": str(e)}
+
+
+async def db_metrics() -> Optional[Dict[str, Any]]:
+    """
+    Query engine pool metrics (busy/idle connections, queries waiting for a connection and
+    their wait-time histogram), from the Prisma `metrics` preview feature.
+    """
+    if not prisma.is_connected():
+        return None
+    try:
+        metrics = await prisma.get_metrics()
+        return metrics.model_dump(mode="json")
+    except Exception as e:
+        print(f"[WARNING] Failed to read database metrics: {e}")
+        return None
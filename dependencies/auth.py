@@ -1,15 +1,13 @@
 from fastapi import Request, HTTPException, status
-from prisma import Prisma
+from prisma.models import users
+from core.database import prisma
+from helpers.auth_cache import get_cached_user, cache_user
 
-prisma = Prisma()
 
 async def get_current_user(request: Request):
     """
     Dependency to authenticate user via wallet address in Authorization header
     """
-    if not prisma.is_connected():
-        await prisma.connect()
-    
     # Get wallet address from Authorization header
     wallet_address = request.headers.get("authorization")
     
@@ -19,10 +17,15 @@ async def get_current_user(request: Request):
             detail="User not authenticated"
         )
     
-    # Find user in database
-    user = await prisma.users.find_unique(
-        where={"wallet_address": wallet_address}
-    )
+    # Find user in the auth cache, then the database
+    found, cached = await get_cached_user(wallet_address)
+    if found:
+        user = users.model_validate(cached) if cached else None
+    else:
+        user = await prisma.users.find_unique(
+            where={"wallet_address": wallet_address}
+        )
+        await cache_user(wallet_address, user.model_dump(mode='json') if user else None)
     
     if not user:
         raise HTTPException(
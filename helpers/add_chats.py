@@ -1,30 +1,37 @@
 from helpers.redis_functions import add_message_to_chat
-from prisma import Prisma
+from core.database import prisma
 
-prisma = Prisma()
+
+def validate_chat(session_id: str, message: str, message_type: str, detected_intent: str, user_id: str):
+    """
+    Check a chat message before saving it.
+
+    Returns:
+        None if valid, otherwise an error dict with status and message
+    """
+    if not session_id or not user_id:
+        print("[ERROR] Session ID and User ID are required")
+        return {"status": "error", "message": "Session ID and User ID are required"}
+    
+    if not message:
+        print("[ERROR] Message is required")
+        return {"status": "error", "message": "Message is required"}
+    
+    if message_type not in ["user", "assistant", "system"]:
+        print(f"[ERROR] Invalid message_type: {message_type}")
+        return {"status": "error", "message": f"Invalid message_type: {message_type}. Must be user/assistant/system"}
+    
+    if detected_intent and (not isinstance(detected_intent, str) or len(detected_intent) > 100):
+        print(f"[ERROR] Detected intent must be a string with max length 100")
+        return {"status": "error", "message": "Detected intent must be a string with max length 100"}
+    return None
 
 async def add_chats(session_id: str, message: str, message_type: str, detected_intent: str, user_id: str):
     try:
         # Validate inputs
-        if not session_id or not user_id:
-            print("[ERROR] Session ID and User ID are required")
-            return {"status": "error", "message": "Session ID and User ID are required"}
-        
-        if not message:
-            print("[ERROR] Message is required")
-            return {"status": "error", "message": "Message is required"}
-        
-        if message_type not in ["user", "assistant", "system"]:
-            print(f"[ERROR] Invalid message_type: {message_type}")
-            return {"status": "error", "message": f"Invalid message_type: {message_type}. Must be user/assistant/system"}
-        
-        if detected_intent and (not isinstance(detected_intent, str) or len(detected_intent) > 100):
-            print(f"[ERROR] Detected intent must be a string with max length 100")
-            return {"status": "error", "message": "Detected intent must be a string with max length 100"}
-        
-        # Connect to database if not connected
-        if not prisma.is_connected():
-            await prisma.connect()
+        error = validate_chat(session_id, message, message_type, detected_intent, user_id)
+        if error:
+            return error
         
         # Save message to database
         try:
@@ -43,7 +50,7 @@ async def add_chats(session_id: str, message: str, message_type: str, detected_i
             return {"status": "error", "message": f"Failed to save message to database: {str(e)}"}
         
         # Store message in Redis
-        result = add_message_to_chat(session_id, message, message_type, detected_intent)
+        result = await add_message_to_chat(session_id, message, message_type, detected_intent)
         
         if result.get("status") == "error":
             print(f"[ERROR] Failed to store message in Redis: {result.get('message')}")
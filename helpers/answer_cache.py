@@ -0,0 +1,165 @@
+import hashlib
+import json
+import time
+import numpy as np
+import redis
+from typing import List, Dict, Any, Optional
+from helpers.redis_functions import async_r, get_page_meta
+from helpers import metrics
+from core.config import ANSWER_CACHE_MIN_SIMILARITY, ANSWER_CACHE_MAX_ENTRIES
+
+# One Redis hash per (page fingerprint, scope):
+#   q:{id} -> JSON {query, answer, created_at}
+#   v:{id} -> float32 query embedding
+#   h:{id} -> hit count
+# The fingerprint changes whenever the page content does, so stale answers are never matched,
+# and the key expires when the page's freshness window ends. Past ANSWER_CACHE_MAX_ENTRIES
+# answers, a new one replaces the least hit (then oldest) entry.
+
+
+def _cache_key(fingerprint: str, scope: str) -> str:
+    return f"answers:{fingerprint}:{scope}"
+
+
+def _entry_id(user_query: str) -> str:
+    return hashlib.md5(" ".join(user_query.lower().split()).encode()).hexdigest()[:16]
+
+
+async def _eviction_candidates(pipe, key: str, keep: int) -> List[str]:
+    """Entry ids to drop so at most `keep` remain: fewest hits first, oldest first among equals."""
+    ids = [field[2:].decode("utf-8") for field in await pipe.hkeys(key) if field.startswith(b"q:")]
+    if len(ids) <= keep:
+        return []
+    hits = await pipe.hmget(key, [f"h:{entry_id}" for entry_id in ids])
+    entries = await pipe.hmget(key, [f"q:{entry_id}" for entry_id in ids])
+    ranked = sorted(
+        zip(ids, hits, entries),
+        key=lambda item: (int(item[1] or 0), json.loads(item[2])["created_at"] if item[2] else 0),
+    )
+    return [entry_id for entry_id, _, _ in ranked[:len(ids) - keep]]
+
+
+def _remaining_freshness(meta: Dict[str, Any]) -> int:
+    return int(meta["ttl"] - (time.time() - meta["scraped_at"]))
+
+
+async def lookup_answer(url: str, scope: str, query_embedding: List[float], meta: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Find a previous answer to a semantically similar question about the same page content.
+
+    Args:
+        url: The page URL
+        scope: Intent scope the answer was produced for
+        query_embedding: Embedding of the new question
+        meta: get_page_meta() result, if the caller already has it
+
+    Returns:
+        Dict with answer, query, similarity and entry_id, or None on a miss
+    """
+    try:
+        meta = meta or await get_page_meta(url)
+        if not meta or not meta["fresh"] or not meta["fingerprint"]:
+            metrics.incr("answer_cache.misses")
+            return None
+
+        key = _cache_key(meta["fingerprint"], scope)
+        entries = await async_r.hgetall(key)
+        ids, vectors = [], []
+        for field, value in entries.items():
+            if field.startswith(b"v:"):
+                ids.append(field[2:].decode("utf-8"))
+                vectors.append(np.frombuffer(value, dtype=np.float32))
+        if not ids:
+            metrics.incr("answer_cache.misses")
+            return None
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        similarities = np.vstack(vectors) @ query
+        best = int(np.argmax(similarities))
+        if similarities[best] < ANSWER_CACHE_MIN_SIMILARITY or f"q:{ids[best]}".encode() not in entries:
+            metrics.incr("answer_cache.misses")
+            return None
+
+        entry = json.loads(entries[f"q:{ids[best]}".encode()])
+        await async_r.hincrby(key, f"h:{ids[best]}", 1)
+        metrics.incr("answer_cache.hits")
+        return {
+            "answer": entry["answer"],
+            "query": entry["query"],
+            "similarity": float(similarities[best]),
+            "entry_id": ids[best],
+        }
+    except Exception as e:
+        print(f"[ERROR] Answer cache lookup failed: {e}")
+        metrics.incr("answer_cache.errors")
+        return None
+
+
+async def store_answer(url: str, scope: str, user_query: str, query_embedding: List[float], answer: str) -> Dict[str, Any]:
+    """
+    Cache an answer for the page's current content. Expires with the page's freshness window.
+
+    Returns:
+        Dict with status and message
+    """
+    try:
+        meta = await get_page_meta(url)
+        if not meta or not meta["fresh"] or not meta["fingerprint"]:
+            return {"status": "skipped", "message": "Page is not indexed or no longer fresh"}
+        remaining = _remaining_freshness(meta)
+        if remaining <= 0:
+            return {"status": "skipped", "message": "Page freshness window already ended"}
+
+        key = _cache_key(meta["fingerprint"], scope)
+        entry_id = _entry_id(user_query)
+        vector = np.asarray(query_embedding, dtype=np.float32)
+        vector = vector / max(float(np.linalg.norm(vector)), 1e-12)
+        async with async_r.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    evicted = []
+                    if not await pipe.hexists(key, f"q:{entry_id}"):
+                        evicted = await _eviction_candidates(pipe, key, ANSWER_CACHE_MAX_ENTRIES - 1)
+                    pipe.multi()
+                    if evicted:
+                        pipe.hdel(key, *[f"{kind}:{old_id}" for old_id in evicted for kind in ("q", "v", "h")])
+                    pipe.hset(key, mapping={
+                        f"q:{entry_id}": json.dumps({"query": user_query, "answer": answer, "created_at": time.time()}),
+                        f"v:{entry_id}": vector.tobytes(),
+                    })
+                    pipe.hsetnx(key, f"h:{entry_id}", 0)
+                    pipe.expire(key, remaining)
+                    await pipe.execute()
+                    break
+                except redis.exceptions.WatchError:
+                    continue  # Another worker changed the page's answers - look again
+        if evicted:
+            metrics.incr("answer_cache.evictions", len(evicted))
+        metrics.incr("answer_cache.stores")
+        return {"status": "success", "message": f"Cached answer {entry_id} for {remaining}s"}
+    except Exception as e:
+        return {"status": "error", "message": f"Failed to cache answer: {str(e)}"}
+
+
+async def get_answer_stats(url: str, scope: str) -> List[Dict[str, Any]]:
+    """
+    Cached answers for a page with their hit counts, most hit first.
+    """
+    meta = await get_page_meta(url)
+    if not meta or not meta["fingerprint"]:
+        return []
+    entries = await async_r.hgetall(_cache_key(meta["fingerprint"], scope))
+    stats = []
+    for field, value in entries.items():
+        if field.startswith(b"q:"):
+            entry_id = field[2:].decode("utf-8")
+            entry = json.loads(value)
+            stats.append({
+                "entry_id": entry_id,
+                "query": entry["query"],
+                "created_at": entry["created_at"],
+                "hits": int(entries.get(f"h:{entry_id}".encode(), 0)),
+            })
+    return sorted(stats, key=lambda item: item["hits"], reverse=True)
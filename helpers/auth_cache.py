@@ -0,0 +1,102 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+from helpers.redis_functions import async_r
+from helpers import metrics
+from core.config import (
+    AUTH_CACHE_TTL_SECONDS,
+    AUTH_CACHE_NEGATIVE_TTL_SECONDS,
+    AUTH_CACHE_LOCAL_TTL_SECONDS,
+    AUTH_CACHE_LOCAL_MAX_ENTRIES,
+)
+
+# Users by wallet address, two tiers:
+#   in-process: OrderedDict wallet -> (expires_at, user dict or None), LRU-capped
+#   Redis:      auth:user:{wallet} -> JSON user dict, or "null" for "no such user"
+# Negative entries ("no such user") live for AUTH_CACHE_NEGATIVE_TTL_SECONDS in both tiers,
+# so a wallet that signs up is recognised quickly by every worker.
+NEGATIVE = b"null"
+
+_local: "OrderedDict[str, Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _key(wallet_address: str) -> str:
+    return f"auth:user:{wallet_address}"
+
+
+def _record(hit: bool):
+    _stats["hits" if hit else "misses"] += 1
+    total = _stats["hits"] + _stats["misses"]
+    metrics.set_gauge("auth_cache.hit_ratio", _stats["hits"] / total)
+
+
+def _remember(wallet_address: str, user: Optional[Dict[str, Any]]):
+    ttl = AUTH_CACHE_LOCAL_TTL_SECONDS if user is not None else min(AUTH_CACHE_LOCAL_TTL_SECONDS, AUTH_CACHE_NEGATIVE_TTL_SECONDS)
+    _local[wallet_address] = (time.monotonic() + ttl, user)
+    _local.move_to_end(wallet_address)
+    while len(_local) > AUTH_CACHE_LOCAL_MAX_ENTRIES:
+        _local.popitem(last=False)
+
+
+async def get_cached_user(wallet_address: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """
+    Look a user up in the auth cache.
+
+    Returns:
+        (found, user) - found is False on a cache miss; when True, user is the cached
+        user dict or None if the wallet is cached as unknown
+    """
+    entry = _local.get(wallet_address)
+    if entry:
+        expires_at, user = entry
+        if expires_at > time.monotonic():
+            _local.move_to_end(wallet_address)
+            metrics.incr("auth_cache.local_hits" if user is not None else "auth_cache.negative_hits")
+            _record(True)
+            return True, user
+        del _local[wallet_address]
+
+    try:
+        raw = await async_r.get(_key(wallet_address))
+    except Exception as e:
+        print(f"[ERROR] Auth cache lookup failed: {e}")
+        metrics.incr("auth_cache.errors")
+        raw = None
+    if raw is None:
+        metrics.incr("auth_cache.misses")
+        _record(False)
+        return False, None
+
+    user = None if raw == NEGATIVE else json.loads(raw)
+    _remember(wallet_address, user)
+    metrics.incr("auth_cache.redis_hits" if user is not None else "auth_cache.negative_hits")
+    _record(True)
+    return True, user
+
+
+async def cache_user(wallet_address: str, user: Optional[Dict[str, Any]]):
+    """Cache a user (JSON-serializable dict), or None to remember that the wallet has no user."""
+    _remember(wallet_address, user)
+    try:
+        if user is None:
+            await async_r.set(_key(wallet_address), NEGATIVE, ex=AUTH_CACHE_NEGATIVE_TTL_SECONDS)
+        else:
+            await async_r.set(_key(wallet_address), json.dumps(user), ex=AUTH_CACHE_TTL_SECONDS)
+    except Exception as e:
+        print(f"[ERROR] Failed to cache user: {e}")
+        metrics.incr("auth_cache.errors")
+
+
+async def invalidate_user(wallet_address: str):
+    """
+    Drop a wallet from the cache. Call after creating or changing a user. Other workers'
+    in-process entries expire within AUTH_CACHE_LOCAL_TTL_SECONDS.
+    """
+    _local.pop(wallet_address, None)
+    try:
+        await async_r.delete(_key(wallet_address))
+    except Exception as e:
+        print(f"[ERROR] Failed to invalidate cached user: {e}")
+        metrics.incr("auth_cache.errors")
@@ -0,0 +1,273 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+from prisma import errors as prisma_errors
+from core.database import prisma
+from helpers.add_chats import validate_chat
+from helpers.redis_functions import async_r, add_messages_to_chat
+from helpers import metrics
+from core.config import (
+    CHAT_WRITE_BATCH_SIZE,
+    CHAT_WRITE_FLUSH_MS,
+    CHAT_WRITE_MAX_RETRIES,
+    CHAT_WRITE_QUEUE_MAX,
+    CHAT_WRITE_DRAIN_SECONDS,
+)
+
+# Rows that could not be written after all retries (or didn't fit in the queue), newest first
+DEAD_LETTER_KEY = "chat:dead_letter"
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    Whether a failed write is worth retrying as-is. Errors about the rows themselves
+    (constraint violations, missing or invalid values) fail the same way every time.
+    """
+    return not isinstance(error, (prisma_errors.DataError, prisma_errors.BuilderError))
+
+
+async def with_retries(operation, what: str, max_retries: int, base_delay: float = 0.2, retry_if=None):
+    """
+    Run `operation()` with exponential backoff. Raises the last error when retries run out,
+    or straight away when `retry_if(error)` says the error isn't worth retrying.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return await operation()
+        except Exception as e:
+            if attempt == max_retries or (retry_if and not retry_if(e)):
+                raise
+            delay = base_delay * (2 ** attempt)
+            metrics.incr("chat_writer.retries")
+            print(f"[WARNING] {what} failed (attempt {attempt + 1}/{max_retries + 1}), retrying in {delay:.1f}s: {e}")
+            await asyncio.sleep(delay)
+
+
+class ChatWriter:
+    """
+    Write-behind persistence for chat messages.
+
+    Request handlers enqueue a turn (the user message and the assistant answer) and return
+    right away. A single background worker collects turns for up to CHAT_WRITE_FLUSH_MS or
+    CHAT_WRITE_BATCH_SIZE rows, writes them to Postgres with one create_many, then appends
+    them to the Redis chat history. Transient failures are retried with backoff; a batch
+    rejected for its data is split and written turn by turn, so only the offending turn
+    ends up in the Redis dead-letter list (see replay_dead_letters()).
+    """
+
+    def __init__(self, batch_size: int, flush_ms: float, max_retries: int, queue_max: int):
+        self.batch_size = batch_size
+        self.flush_ms = flush_ms
+        self.max_retries = max_retries
+        self.queue: Optional[asyncio.Queue] = None
+        self.queue_max = queue_max
+        self.worker: Optional[asyncio.Task] = None
+        self.accepting = False
+
+    async def start(self):
+        if self.worker:
+            return
+        self.queue = asyncio.Queue(maxsize=self.queue_max)
+        self.accepting = True
+        self.worker = asyncio.create_task(self._run())
+        print("[LOG] Chat writer started")
+
+    def enqueue(self, session_id: str, user_id: str, detected_intent: str, messages: List[Tuple[str, str]]) -> Dict[str, Any]:
+        """
+        Queue one conversation turn for persistence.
+
+        Args:
+            session_id: The session identifier
+            user_id: Owner of the session
+            detected_intent: Intent stored with every message of the turn
+            messages: (message, message_type) pairs in conversation order
+
+        Returns:
+            Dict with status and message
+        """
+        now = datetime.utcnow()
+        rows = []
+        for i, (message, message_type) in enumerate(messages):
+            error = validate_chat(session_id, message, message_type, detected_intent, user_id)
+            if error:
+                return error
+            rows.append({
+                "session_id": session_id,
+                "user_id": user_id,
+                "message": message,
+                "message_type": message_type,
+                "detected_intent": detected_intent,
+                # Set here, not by the database, so the order survives batching and retries
+                "created_at": now + timedelta(microseconds=i),
+            })
+        if not rows:
+            return {"status": "error", "message": "No messages to save"}
+
+        if not self.accepting:
+            asyncio.create_task(self._dead_letter(rows, "writer not running"))
+            return {"status": "error", "message": "Chat writer is not running"}
+        try:
+            self.queue.put_nowait(rows)
+        except asyncio.QueueFull:
+            metrics.incr("chat_writer.rejected")
+            asyncio.create_task(self._dead_letter(rows, "queue full"))
+            return {"status": "error", "message": "Chat write queue is full"}
+
+        metrics.set_gauge("chat_writer.queue_depth", self.queue.qsize())
+        return {"status": "queued", "message": f"Queued {len(rows)} messages"}
+
+    async def _run(self):
+        while True:
+            turns = [await self.queue.get()]
+            rows = list(turns[0])
+            deadline = time.monotonic() + self.flush_ms / 1000
+            while len(rows) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    turn = await asyncio.wait_for(self.queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                turns.append(turn)
+                rows.extend(turn)
+            try:
+                await self._flush(turns)
+            except Exception as e:
+                print(f"[ERROR] Chat writer flush failed: {e}")
+            finally:
+                for _ in turns:
+                    self.queue.task_done()
+                metrics.set_gauge("chat_writer.queue_depth", self.queue.qsize())
+
+    async def _insert(self, rows: List[Dict[str, Any]], what: str):
+        async def write_db():
+            return await prisma.chat_messages.create_many(data=rows)
+
+        await with_retries(write_db, what, self.max_retries, retry_if=is_transient)
+
+    async def _flush(self, turns: List[List[Dict[str, Any]]]):
+        start = time.perf_counter()
+        rows = [row for turn in turns for row in turn]
+
+        try:
+            await self._insert(rows, "Chat message insert")
+        except Exception as e:
+            if is_transient(e) or len(turns) == 1:
+                print(f"[ERROR] Giving up on {len(rows)} chat messages: {e}")
+                await self._dead_letter(rows, str(e))
+                return
+            # Something in the batch is bad (e.g. its session was deleted) - don't let it take
+            # the other sessions' messages down with it
+            print(f"[WARNING] Batch of {len(turns)} turns rejected ({e}), inserting turn by turn")
+            metrics.incr("chat_writer.batch_splits")
+            rows = []
+            for turn in turns:
+                try:
+                    await self._insert(turn, "Chat turn insert")
+                    rows.extend(turn)
+                except Exception as turn_error:
+                    print(f"[ERROR] Giving up on a turn of session {turn[0]['session_id']}: {turn_error}")
+                    await self._dead_letter(turn, str(turn_error))
+            if not rows:
+                return
+
+        # Sessions are listed by last_activity; one round trip for every session in the batch
+        newest: Dict[str, datetime] = {}
+        for row in rows:
+            newest[row["session_id"]] = max(newest.get(row["session_id"], row["created_at"]), row["created_at"])
+        try:
+            async with prisma.batch_() as batcher:
+                for session_id, last_activity in newest.items():
+                    batcher.chat_sessions.update_many(where={"id": session_id}, data={"last_activity": last_activity})
+        except Exception as e:
+            print(f"[ERROR] Failed to update session last_activity: {e}")
+
+        # Postgres is the source of truth; Redis only mirrors recent history
+        by_session: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_session.setdefault(row["session_id"], []).append({
+                "message": row["message"],
+                "message_type": row["message_type"],
+                "detected_intent": row["detected_intent"],
+                "created_at": row["created_at"].isoformat(),
+            })
+        for session_id, messages in by_session.items():
+            async def append(session_id=session_id, messages=messages):
+                result = await add_messages_to_chat(session_id, messages)
+                if result.get("status") == "error":
+                    raise RuntimeError(result["message"])
+            try:
+                await with_retries(append, "Redis chat append", self.max_retries)
+            except Exception as e:
+                metrics.incr("chat_writer.redis_errors")
+                print(f"[ERROR] Failed to append chat history to Redis for session {session_id}: {e}")
+
+        metrics.incr("chat_writer.flushed_messages", len(rows))
+        metrics.observe("chat_writer.flush_ms", (time.perf_counter() - start) * 1000)
+
+    async def _dead_letter(self, rows: List[Dict[str, Any]], error: str):
+        metrics.incr("chat_writer.dead_lettered", len(rows))
+        record = {
+            "rows": [{**row, "created_at": row["created_at"].isoformat()} for row in rows],
+            "error": error,
+            "failed_at": datetime.utcnow().isoformat(),
+        }
+        try:
+            await async_r.lpush(DEAD_LETTER_KEY, json.dumps(record))
+        except Exception as e:
+            # Last resort: keep the data in the logs
+            print(f"[ERROR] Failed to dead-letter chat messages ({e}): {json.dumps(record)}")
+
+    async def stop(self, timeout: float = CHAT_WRITE_DRAIN_SECONDS):
+        """Stop accepting writes, flush what is queued, and dead-letter whatever doesn't make it in time."""
+        if not self.worker:
+            return
+        self.accepting = False
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"[WARNING] Chat writer did not drain within {timeout}s")
+        self.worker.cancel()
+        try:
+            await self.worker
+        except (asyncio.CancelledError, Exception):
+            pass
+        self.worker = None
+
+        leftover = 0
+        while not self.queue.empty():
+            rows = self.queue.get_nowait()
+            leftover += len(rows)
+            await self._dead_letter(rows, "not flushed before shutdown")
+        print(f"[LOG] Chat writer stopped ({leftover} messages dead-lettered)")
+
+    async def replay_dead_letters(self, limit: int = 100) -> Dict[str, Any]:
+        """
+        Move dead-lettered turns back onto the queue, oldest first. main.py's lifespan calls
+        this once the database is connected; turns that fail again are dead-lettered again.
+        Only turns whose Postgres insert failed are dead-lettered, so a replay never
+        duplicates rows.
+
+        Returns:
+            Dict with status and message
+        """
+        replayed = 0
+        for _ in range(limit):
+            raw = await async_r.rpop(DEAD_LETTER_KEY)
+            if not raw:
+                break
+            record = json.loads(raw)
+            rows = [{**row, "created_at": datetime.fromisoformat(row["created_at"])} for row in record["rows"]]
+            try:
+                self.queue.put_nowait(rows)
+            except (asyncio.QueueFull, AttributeError):
+                await async_r.rpush(DEAD_LETTER_KEY, raw)
+                break
+            replayed += 1
+        return {"status": "success", "message": f"Replayed {replayed} dead-lettered turns"}
+
+
+chat_writer = ChatWriter(CHAT_WRITE_BATCH_SIZE, CHAT_WRITE_FLUSH_MS, CHAT_WRITE_MAX_RETRIES, CHAT_WRITE_QUEUE_MAX)
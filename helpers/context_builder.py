@@ -0,0 +1,223 @@
+import asyncio
+import math
+import re
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional
+from helpers.redis_functions import async_r, get_chat_history_range, get_chat_history_length
+from helpers.llm_clients import get_llm
+from helpers import metrics
+from langchain_core.messages import HumanMessage
+from prompts.chat_summary_prompt import chat_summary_prompt
+from core.config import CHAT_CONTEXT_TOKEN_BUDGET, CHAT_SUMMARY_MAX_TOKENS, CHAT_SUMMARY_TRIGGER_TOKENS
+
+# chat:{session_id}:summary hash: summary text, covered_until (created_at of the newest
+# message folded into it) and covered_count
+SUMMARY_LOCK_SECONDS = 120
+# Part of the budget reserved for the newest messages; the rest can go to older, relevant ones
+RECENT_SHARE = 0.75
+_STOPWORDS = {"the", "a", "an", "is", "are", "was", "it", "this", "that", "those", "them", "of", "to", "in",
+              "on", "for", "and", "or", "me", "my", "you", "your", "i", "what", "which", "about", "with"}
+
+_summary_tasks = set()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for budgeting."""
+    return math.ceil(len(text) / 4) if text else 0
+
+
+def format_message(message: Dict[str, Any]) -> str:
+    return f"{message.get('message_type')}: {message.get('message')}"
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    """
+    created_at values come as naive isoformat() from the chat writer and with "Z"/"+00:00"
+    from Prisma JSON; all of them are UTC. Returns an aware datetime, or None if unparseable.
+    """
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def is_after(message: Dict[str, Any], cutoff: Optional[datetime]) -> bool:
+    """Whether a message is newer than `cutoff` (every message with a timestamp is, if cutoff is None)."""
+    created_at = parse_timestamp(message.get("created_at"))
+    return created_at is not None and (cutoff is None or created_at > cutoff)
+
+
+def _terms(text: str) -> set:
+    return {word for word in re.findall(r"[a-z0-9]+", (text or "").lower()) if word not in _STOPWORDS and len(word) > 2}
+
+
+async def get_summary(session_id: str) -> Dict[str, Any]:
+    try:
+        record = await async_r.hgetall(f"chat:{session_id}:summary")
+    except Exception as e:
+        print(f"[ERROR] Failed to get chat summary: {e}")
+        record = {}
+    record = {k.decode("utf-8"): v.decode("utf-8") for k, v in record.items()}
+    return {
+        "summary": record.get("summary", ""),
+        "covered_until": record.get("covered_until", ""),
+        "covered_count": int(record.get("covered_count", 0)),
+    }
+
+
+async def update_summary(session_id: str, pending: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Fold `pending` (messages newer than the current summary, oldest first) into the rolling
+    summary. Only one update per session runs at a time; the others are skipped and their
+    messages get picked up by the next update.
+
+    Returns:
+        Dict with status and message
+    """
+    lock_key = f"chat:{session_id}:summary_lock"
+    if not await async_r.set(lock_key, "1", nx=True, ex=SUMMARY_LOCK_SECONDS):
+        return {"status": "skipped", "message": "Summary update already running"}
+    try:
+        current = await get_summary(session_id)
+        covered_until = parse_timestamp(current["covered_until"])
+        pending = [msg for msg in pending if is_after(msg, covered_until)]
+        if not pending:
+            return {"status": "skipped", "message": "Nothing new to summarize"}
+
+        prompt = chat_summary_prompt(
+            current["summary"],
+            "\n".join(format_message(msg) for msg in pending),
+            max_words=int(CHAT_SUMMARY_MAX_TOKENS * 0.75),
+        )
+        response = await get_llm("gemini-2.5-flash", temperature=0.2).ainvoke([HumanMessage(content=prompt)])
+        summary = (response.content or "").strip() if response else ""
+        if not summary:
+            return {"status": "error", "message": "Empty summary from LLM"}
+
+        await async_r.hset(f"chat:{session_id}:summary", mapping={
+            "summary": summary,
+            "covered_until": parse_timestamp(pending[-1].get("created_at")).isoformat(),
+            "covered_count": current["covered_count"] + len(pending),
+        })
+        metrics.incr("chat_context.summary_updates")
+        print(f"[LOG] Folded {len(pending)} messages into the summary for session {session_id}")
+        return {"status": "success", "message": f"Summarized {len(pending)} messages"}
+    except Exception as e:
+        metrics.incr("chat_context.summary_errors")
+        print(f"[ERROR] Failed to update chat summary: {e}")
+        return {"status": "error", "message": f"Failed to update chat summary: {str(e)}"}
+    finally:
+        await async_r.delete(lock_key)
+
+
+async def summarize_older_messages(session_id: str, known: List[Dict[str, Any]], older_count: int) -> Dict[str, Any]:
+    """
+    Fold the messages that weren't sent with the prompt into the summary, once the ones it
+    doesn't cover yet add up to CHAT_SUMMARY_TRIGGER_TOKENS.
+
+    Args:
+        session_id: The session identifier
+        known: The older part of the window that wasn't sent, oldest first
+        older_count: Number of stored messages older than the window, loaded from Redis
+    """
+    older = await get_chat_history_range(session_id, 0, older_count - 1) if older_count > 0 else []
+    covered_until = parse_timestamp((await get_summary(session_id))["covered_until"])
+    pending = [msg for msg in older + known if is_after(msg, covered_until)]
+    if sum(estimate_tokens(format_message(msg)) for msg in pending) < CHAT_SUMMARY_TRIGGER_TOKENS:
+        return {"status": "skipped", "message": "Not enough new messages to summarize"}
+    return await update_summary(session_id, pending)
+
+
+def _schedule_summary_update(session_id: str, known: List[Dict[str, Any]], older_count: int):
+    task = asyncio.create_task(summarize_older_messages(session_id, known, older_count))
+    _summary_tasks.add(task)
+    task.add_done_callback(_summary_tasks.discard)
+
+
+async def build_chat_context(
+    session_id: str,
+    messages: List[Dict[str, Any]],
+    user_query: Optional[str] = None,
+    token_budget: int = CHAT_CONTEXT_TOKEN_BUDGET,
+) -> str:
+    """
+    Assemble the conversation context for a prompt within `token_budget` (estimated) tokens.
+
+    Newest messages are packed first. Older messages that still fit and share terms with
+    `user_query` are added back, and everything else is represented by the session's
+    rolling summary. Every message of the session's history older than the packed recent
+    messages that isn't in the summary yet - inside `messages` or already out of it - is
+    folded into it in the background, so the summary is never rebuilt from scratch.
+
+    Args:
+        session_id: The session identifier
+        messages: The newest chat messages, oldest first (e.g. get_session_details()["chat_messages"]),
+            i.e. the tail of the session's Redis chat history
+        user_query: The current question, used to pick relevant older messages
+        token_budget: Estimated token limit for the returned text
+
+    Returns:
+        Chat history text for the prompt
+    """
+    messages = messages or []
+    summary = await get_summary(session_id)
+    summary_text = f"Summary of earlier conversation:\n{summary['summary']}\n\n" if summary["summary"] else ""
+    remaining = token_budget - estimate_tokens(summary_text)
+
+    def cost(i: int) -> int:
+        return estimate_tokens(format_message(messages[i])) + 1
+
+    # Newest first, until the next message doesn't fit in the recent share of the budget
+    start = len(messages)
+    recent_remaining = int(remaining * RECENT_SHARE)
+    while start > 0 and cost(start - 1) <= recent_remaining:
+        recent_remaining -= cost(start - 1)
+        remaining -= cost(start - 1)
+        start -= 1
+    selected = set(range(start, len(messages)))
+
+    # Then older messages sharing terms with the query, most overlap first
+    query_terms = _terms(user_query)
+    if query_terms and start > 0:
+        overlaps = {i: len(query_terms & _terms(messages[i].get("message"))) for i in range(start)}
+        for i in sorted(overlaps, key=lambda i: (overlaps[i], i), reverse=True):
+            if not overlaps[i]:
+                break
+            if cost(i) <= remaining:
+                selected.add(i)
+                remaining -= cost(i)
+
+    # Whatever is left goes to extending the recent window
+    while start > 0 and (start - 1 in selected or cost(start - 1) <= remaining):
+        if start - 1 not in selected:
+            selected.add(start - 1)
+            remaining -= cost(start - 1)
+        start -= 1
+
+    # Everything older than the recent messages belongs in the summary: the rest of this window,
+    # and any stored messages that already slid out of it. Those are only loaded (in the
+    # background) while the summary doesn't reach back to the window yet.
+    covered_until = parse_timestamp(summary["covered_until"])
+    pending = [msg for msg in messages[:start] if is_after(msg, covered_until)]
+    older_count = max(await get_chat_history_length(session_id) - len(messages), 0)
+    gap_before_window = older_count > 0 and bool(messages) and is_after(messages[0], covered_until)
+    if gap_before_window or sum(estimate_tokens(format_message(msg)) for msg in pending) >= CHAT_SUMMARY_TRIGGER_TOKENS:
+        _schedule_summary_update(session_id, pending, older_count if gap_before_window else 0)
+
+    lines = []
+    previous = None
+    for i in sorted(selected):
+        if previous is not None and i != previous + 1:
+            lines.append("...")
+        lines.append(format_message(messages[i]))
+        previous = i
+
+    metrics.incr("chat_context.builds")
+    metrics.incr("chat_context.tokens", token_budget - remaining)
+    return summary_text + "\n".join(lines)
@@ -1,20 +1,190 @@
-from sentence_transformers import SentenceTransformer
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Dict
+from core.config import (
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_MAX_WAIT_MS,
+    EMBEDDING_WORKERS,
+    EMBEDDING_CACHE_MAX_BYTES,
+    EMBEDDING_CACHE_TTL_SECONDS,
+    EMBEDDING_BACKEND,
+    EMBEDDING_ONNX_DIR,
+    EMBEDDING_ONNX_THREADS,
+)
+from helpers.embedding_backends import EmbeddingBackend, create_backend
+from helpers.embedding_cache import EmbeddingCache
+from helpers.redis_functions import r, VECTOR_DIM
 import numpy as np
+import threading
+import asyncio
+import time
 
-# Load a lightweight embedding model (384-dimensional)
-model = SentenceTransformer('all-MiniLM-L6-v2')
+MODEL_NAME = 'all-MiniLM-L6-v2'
+EMBEDDING_DIM = VECTOR_DIM  # every backend must keep the 384-dim storage contract
+MAX_CHUNK_CHARS = 1000
 
-def generate_embedding(text_chunk: str) -> np.ndarray:
+# Lightweight embedding model (384-dimensional), loaded on first use by get_backend()
+backend: EmbeddingBackend = None
+_backend_lock = threading.Lock()
+
+# Repeated chunks and queries are served from here instead of the model.
+# Backends differ slightly numerically, so each gets its own cache namespace.
+embedding_cache = EmbeddingCache(
+    r, f"{MODEL_NAME}/{EMBEDDING_BACKEND}", EMBEDDING_DIM, EMBEDDING_CACHE_MAX_BYTES, EMBEDDING_CACHE_TTL_SECONDS
+)
+
+
+def get_backend() -> EmbeddingBackend:
+    """
+    Load the configured embedding backend (EMBEDDING_BACKEND) on first use.
+
+    Importing torch/onnxruntime and loading the weights takes seconds, so it is
+    deferred until something actually needs an embedding instead of happening at import time.
+    """
+    global backend
+    if backend is None:
+        with _backend_lock:
+            if backend is None:
+                start = time.perf_counter()
+                backend = create_backend(EMBEDDING_BACKEND, MODEL_NAME, EMBEDDING_ONNX_DIR, EMBEDDING_ONNX_THREADS)
+                print(f"[LOG] Loaded {backend.name} embedding backend for {MODEL_NAME} in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return backend
+
+
+def warm_up():
+    """Load the backend and run one forward pass so the first real query doesn't pay for it."""
+    get_backend().encode(["warm up"])
+
+
+def _prepare_text(text_chunk: str) -> str:
     if not text_chunk or len(text_chunk.strip()) == 0:
         raise ValueError("Input text chunk is empty.")
-    
-    if len(text_chunk) > 1000:
-        text_chunk = text_chunk[:1000]  # truncate safely
 
-    embedding = model.encode(text_chunk, normalize_embeddings=True)
-    embedding = np.array(embedding, dtype=np.float32)
+    return text_chunk[:MAX_CHUNK_CHARS]  # truncate safely
+
+
+def generate_embedding(text_chunk: str) -> np.ndarray:
+    return generate_embeddings([text_chunk])[0]
+
+
+def _encode(text_chunks: List[str], batch_size: int) -> List[List[float]]:
+    embeddings = get_backend().encode(text_chunks, batch_size=batch_size)
+
+    if embeddings.shape[1] != EMBEDDING_DIM:
+        raise ValueError(f"Expected embedding dimension {EMBEDDING_DIM}, got {embeddings.shape[1]}")
+
+    return embeddings.tolist()
+
+
+def generate_embeddings(text_chunks: List[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> List[List[float]]:
+    """
+    Embed many chunks with a single backend encode call so the model can batch them.
+    Chunks already in embedding_cache skip the model entirely.
+
+    Args:
+        text_chunks: Texts to embed (each truncated to MAX_CHUNK_CHARS)
+        batch_size: Forward-pass batch size passed to the model
+
+    Returns:
+        One 384-dim embedding per input, in input order
+    """
+    if not text_chunks:
+        return []
+
+    prepared = [_prepare_text(chunk) for chunk in text_chunks]
+    embeddings = embedding_cache.get_many(prepared)
+
+    # Encode each distinct missing text once, even if it repeats within the batch
+    missing: Dict[str, str] = {}
+    for text, embedding in zip(prepared, embeddings):
+        if embedding is None:
+            missing.setdefault(embedding_cache.key(text), text)
+
+    if missing:
+        texts = list(missing.values())
+        encoded = _encode(texts, batch_size)
+        embedding_cache.put_many(texts, encoded)
+        by_key = dict(zip(missing.keys(), encoded))
+        embeddings = [
+            embedding if embedding is not None else by_key[embedding_cache.key(text)]
+            for text, embedding in zip(prepared, embeddings)
+        ]
+
+    return embeddings
+
+
+class EmbeddingBatcher:
+    """
+    Async front door for the embedder.
+
+    Requests arriving from different HTTP requests within max_wait_ms of each
+    other are coalesced into one generate_embeddings call, which runs on a
+    small dedicated thread pool so the event loop never blocks on the model.
+    """
+
+    def __init__(self, max_batch: int, max_wait_ms: float, workers: int):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embedder")
+        self._pending: List[Tuple[List[str], asyncio.Future]] = []
+        self._pending_count = 0
+        self._flush_handle = None
+
+    async def embed(self, text_chunks: List[str]) -> List[List[float]]:
+        if not text_chunks:
+            return []
+
+        # Validate here so one bad input can't fail everyone else's batch
+        prepared = [_prepare_text(chunk) for chunk in text_chunks]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((prepared, future))
+        self._pending_count += len(prepared)
+
+        if self._pending_count >= self.max_batch:
+            self._flush(loop)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush, loop)
+
+        return await future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        pending, self._pending, self._pending_count = self._pending, [], 0
+        pending = [(texts, future) for texts, future in pending if not future.cancelled()]
+        if not pending:
+            return
+
+        texts = [text for chunk_texts, _ in pending for text in chunk_texts]
+        batch = loop.run_in_executor(self._executor, generate_embeddings, texts)
+
+        def distribute(done: asyncio.Future):
+            error = done.exception()
+            offset = 0
+            for chunk_texts, future in pending:
+                if future.cancelled():
+                    offset += len(chunk_texts)
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(done.result()[offset:offset + len(chunk_texts)])
+                offset += len(chunk_texts)
+
+        batch.add_done_callback(distribute)
+
+
+batcher = EmbeddingBatcher(EMBEDDING_BATCH_SIZE, EMBEDDING_MAX_WAIT_MS, EMBEDDING_WORKERS)
+
+
+async def agenerate_embeddings(text_chunks: List[str]) -> List[List[float]]:
+    """Async, micro-batched generate_embeddings."""
+    return await batcher.embed(text_chunks)
 
-    if embedding.shape[0] != 384:
-        raise ValueError(f"Expected embedding dimension 384, got {embedding.shape[0]}")
 
-    return embedding.tolist()
+async def agenerate_embedding(text_chunk: str) -> List[float]:
+    """Async, micro-batched generate_embedding."""
+    return (await batcher.embed([text_chunk]))[0]
@@ -0,0 +1,156 @@
+import os
+import numpy as np
+from typing import List
+
+# Longest input the MiniLM checkpoint was trained on; SentenceTransformer truncates here too
+MAX_SEQ_LENGTH = 256
+
+
+class EmbeddingBackend:
+    """
+    Turns a batch of texts into L2-normalized float32 embeddings, shape (len(texts), dim).
+    Backends are interchangeable as long as they agree with the reference
+    (SentenceTransformer) backend - see tests/check_embedding_parity.py.
+    """
+
+    name = "base"
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        raise NotImplementedError
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """The reference PyTorch backend."""
+
+    name = "sentence_transformers"
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        embeddings = self.model.encode(texts, batch_size=batch_size, normalize_embeddings=True, convert_to_numpy=True)
+        return np.asarray(embeddings, dtype=np.float32).reshape(len(texts), -1)
+
+
+def export_onnx(model_name: str, output_dir: str) -> str:
+    """
+    Export the transformer behind a SentenceTransformer checkpoint to ONNX, plus its tokenizer.
+    Needs torch/transformers, but only once - the exported files are reused afterwards.
+
+    Returns:
+        Path of the fp32 model.onnx
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    hub_name = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+    tokenizer = AutoTokenizer.from_pretrained(hub_name)
+    model = AutoModel.from_pretrained(hub_name, return_dict=False).eval()
+    tokenizer.save_pretrained(output_dir)
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    model_path = os.path.join(output_dir, "model.onnx")
+    torch.onnx.export(
+        model,
+        (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]),
+        model_path,
+        input_names=["input_ids", "attention_mask", "token_type_ids"],
+        output_names=["last_hidden_state"],
+        dynamic_axes={
+            "input_ids": {0: "batch", 1: "sequence"},
+            "attention_mask": {0: "batch", 1: "sequence"},
+            "token_type_ids": {0: "batch", 1: "sequence"},
+            "last_hidden_state": {0: "batch", 1: "sequence"},
+        },
+        opset_version=17,
+    )
+    print(f"[LOG] Exported {model_name} to {model_path}")
+    return model_path
+
+
+def quantize_onnx(model_path: str, output_path: str) -> str:
+    """Dynamic int8 quantization of the fp32 ONNX model's weights."""
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    quantize_dynamic(model_path, output_path, weight_type=QuantType.QInt8)
+    print(f"[LOG] Quantized {model_path} to {output_path}")
+    return output_path
+
+
+class OnnxBackend(EmbeddingBackend):
+    """
+    ONNX Runtime CPU backend doing the same tokenize -> transformer -> mean pool -> normalize
+    pipeline as SentenceTransformer, without importing torch at serve time.
+    With quantized=True it runs the int8 dynamically-quantized model instead.
+    """
+
+    def __init__(self, model_name: str, model_dir: str, quantized: bool = False, threads: int = 0):
+        try:
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError("The onnx embedding backends need `onnxruntime` and `tokenizers` installed") from e
+
+        self.name = "onnx_int8" if quantized else "onnx"
+
+        fp32_path = os.path.join(model_dir, "model.onnx")
+        if not os.path.exists(fp32_path):
+            export_onnx(model_name, model_dir)
+        model_path = fp32_path
+        if quantized:
+            model_path = os.path.join(model_dir, "model_int8.onnx")
+            if not os.path.exists(model_path):
+                quantize_onnx(fp32_path, model_path)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {item.name for item in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding()
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encoded = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            input_ids = np.array([item.ids for item in encoded], dtype=np.int64)
+            attention_mask = np.array([item.attention_mask for item in encoded], dtype=np.int64)
+
+            feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.array([item.type_ids for item in encoded], dtype=np.int64)
+
+            hidden = self.session.run(None, feeds)[0]
+
+            # Mean pooling over real tokens, then L2 normalize
+            mask = attention_mask[..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            batches.append(pooled / np.clip(norms, 1e-12, None))
+
+        return np.vstack(batches).astype(np.float32)
+
+
+def create_backend(kind: str, model_name: str, onnx_dir: str, onnx_threads: int = 0) -> EmbeddingBackend:
+    """
+    Build the embedding backend selected by EMBEDDING_BACKEND.
+
+    Args:
+        kind: "sentence_transformers", "onnx" or "onnx_int8"
+        model_name: SentenceTransformer checkpoint name
+        onnx_dir: Where exported ONNX files and the tokenizer live
+        onnx_threads: intra-op threads for ONNX Runtime (0 = library default)
+    """
+    if kind == "sentence_transformers":
+        return SentenceTransformerBackend(model_name)
+    if kind == "onnx":
+        return OnnxBackend(model_name, onnx_dir, quantized=False, threads=onnx_threads)
+    if kind == "onnx_int8":
+        return OnnxBackend(model_name, onnx_dir, quantized=True, threads=onnx_threads)
+    raise ValueError(f"Unknown embedding backend: {kind}. Must be sentence_transformers/onnx/onnx_int8")
@@ -0,0 +1,119 @@
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import List, Optional
+from helpers import metrics
+
+
+class EmbeddingCache:
+    """
+    Two-tier, content-addressed cache of embeddings.
+
+    Keys are a hash of the model name plus the normalized text, so the same chunk
+    (boilerplate footers, repeated blurbs, common questions) is only embedded once.
+    Tier 1 is an in-process LRU capped at max_bytes; tier 2 is Redis holding raw
+    float32 bytes with a TTL. Redis errors degrade to a miss, never to a failure.
+    """
+
+    def __init__(self, redis_client, model_name: str, dim: int, max_bytes: int, redis_ttl: int):
+        self.redis = redis_client
+        self.model_name = model_name
+        self.dim = dim
+        self.max_bytes = max_bytes
+        self.redis_ttl = redis_ttl
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def key(self, text: str) -> str:
+        # The model is uncased and splits on whitespace, so this doesn't change the embedding
+        normalized = " ".join(text.lower().split())
+        digest = hashlib.sha1(f"{self.model_name}\0{normalized}".encode()).hexdigest()
+        return f"emb:{digest}"
+
+    def _remember(self, key: str, vector: np.ndarray):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes + len(key)
+            self._entries[key] = vector
+            self._bytes += vector.nbytes + len(key)
+            while self._bytes > self.max_bytes and self._entries:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes + len(evicted_key)
+                metrics.incr("embedding_cache.evictions")
+            metrics.set_gauge("embedding_cache.l1_bytes", self._bytes)
+            metrics.set_gauge("embedding_cache.l1_entries", len(self._entries))
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Look up every text, in-process first and then Redis for whatever is left.
+
+        Returns:
+            One embedding (or None on a miss) per input, in input order
+        """
+        keys = [self.key(text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+
+        remote = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._entries.get(key)
+                if vector is None:
+                    remote.append(i)
+                else:
+                    self._entries.move_to_end(key)
+                    results[i] = vector.tolist()
+        metrics.incr("embedding_cache.l1_hits", len(texts) - len(remote))
+
+        if remote and self.redis is not None:
+            try:
+                values = self.redis.mget([keys[i] for i in remote])
+            except Exception as e:
+                print(f"[WARNING] Embedding cache Redis lookup failed: {e}")
+                metrics.incr("embedding_cache.errors")
+                values = [None] * len(remote)
+
+            for i, value in zip(remote, values):
+                if not value:
+                    continue
+                vector = np.frombuffer(value, dtype=np.float32)
+                if vector.shape[0] != self.dim:
+                    continue
+                self._remember(keys[i], vector)
+                results[i] = vector.tolist()
+                metrics.incr("embedding_cache.l2_hits")
+
+        metrics.incr("embedding_cache.misses", sum(1 for result in results if result is None))
+        return results
+
+    def put_many(self, texts: List[str], embeddings: List[List[float]]):
+        """Store freshly computed embeddings in both tiers."""
+        if not texts:
+            return
+
+        pipe = self.redis.pipeline(transaction=False) if self.redis is not None else None
+        for text, embedding in zip(texts, embeddings):
+            key = self.key(text)
+            vector = np.asarray(embedding, dtype=np.float32)
+            self._remember(key, vector)
+            if pipe is not None:
+                pipe.set(key, vector.tobytes(), ex=self.redis_ttl)
+
+        if pipe is not None:
+            try:
+                pipe.execute()
+            except Exception as e:
+                print(f"[WARNING] Embedding cache Redis write failed: {e}")
+                metrics.incr("embedding_cache.errors")
+
+    def stats(self):
+        counters = metrics.snapshot()["counters"]
+        hits = counters.get("embedding_cache.l1_hits", 0) + counters.get("embedding_cache.l2_hits", 0)
+        total = hits + counters.get("embedding_cache.misses", 0)
+        return {
+            "l1_entries": len(self._entries),
+            "l1_bytes": self._bytes,
+            "hit_ratio": hits / total if total else 0.0,
+        }
@@ -1,7 +1,10 @@
-import requests
+import asyncio
 from bs4 import BeautifulSoup
 from ddgs import DDGS
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit
+from helpers.http_client import fetch, afetch
+from helpers.parse_pool import parse_pool
+from core.config import LISTING_SCRAPE_PER_SITE, LISTING_SCRAPE_TIMEOUT_SECONDS
 
 SITE_PATTERNS = {
     'myntra.com': {'sp_check': lambda url: '/buy' in url},
@@ -35,29 +38,84 @@ def categorize_urls(urls, site=None):
             list_pages.append(url)
     return product_pages, list_pages
 
-def scrape_product_links(list_page_url, site=None, max_links=20):
+def extract_product_links(html, list_page_url, site=None, max_links=20):
     product_links = set()
+    soup = BeautifulSoup(html, 'html.parser')
+    all_links = soup.find_all('a', href=True)
+    for link in all_links:
+        absolute_url = urljoin(list_page_url, link['href'])
+        if is_product_page(absolute_url, site):
+            if site:
+                if site.lower() in absolute_url.lower():
+                    product_links.add(absolute_url)
+            else:
+                product_links.add(absolute_url)
+        if len(product_links) >= max_links:
+            break
+    return product_links
+
+def scrape_product_links(list_page_url, site=None, max_links=20):
     try:
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(list_page_url, headers=headers, timeout=10)
+        response = fetch(list_page_url, timeout=LISTING_SCRAPE_TIMEOUT_SECONDS)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        all_links = soup.find_all('a', href=True)
-        for link in all_links:
-            absolute_url = urljoin(list_page_url, link['href'])
-            if is_product_page(absolute_url, site):
-                if site:
-                    if site.lower() in absolute_url.lower():
-                        product_links.add(absolute_url)
-                else:
-                    product_links.add(absolute_url)
-            if len(product_links) >= max_links:
-                break
+        return extract_product_links(response.content, list_page_url, site, max_links)
     except Exception:
-        pass
+        return set()
+
+async def ascrape_product_links(list_page_url, site=None, max_links=20):
+    try:
+        response = await afetch(list_page_url, timeout=LISTING_SCRAPE_TIMEOUT_SECONDS)
+        response.raise_for_status()
+        # Parsing is CPU-bound - keep it off the event loop
+        return await parse_pool.run(extract_product_links, response.content, list_page_url, site, max_links)
+    except Exception:
+        return set()
+
+async def expand_list_pages(list_pages, site=None, needed=10, known=(), per_site=LISTING_SCRAPE_PER_SITE):
+    """
+    Scrape listing pages concurrently (at most `per_site` at once per host) for product links.
+    As soon as `needed` distinct links are collected, counting the `known` ones (product pages
+    the search already found), the listing pages still loading are cancelled.
+
+    Returns:
+        Set of product URLs including `known` (may hold slightly more than `needed`)
+    """
+    product_links = set(known)
+    if len(product_links) >= needed or not list_pages:
+        return product_links
+
+    missing = needed - len(product_links)
+    slots = {}
+
+    async def scrape(lp_url):
+        host = urlsplit(lp_url).hostname or ""
+        if host not in slots:
+            slots[host] = asyncio.Semaphore(per_site)
+        async with slots[host]:
+            return await ascrape_product_links(lp_url, site, max_links=missing)
+
+    pending = {asyncio.create_task(scrape(lp_url)) for lp_url in list_pages}
+    try:
+        while pending and len(product_links) < needed:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                product_links.update(task.result())
+    finally:
+        # Enough links (or we were cancelled ourselves) - stop the remaining fetches
+        for task in pending:
+            task.cancel()
+        if pending:
+            print(f"[LOG] Cancelled {len(pending)} listing page fetches after collecting {len(product_links)} product links")
+            await asyncio.gather(*pending, return_exceptions=True)
     return product_links
 
-def browser(query, site=None, limit=10, scrape_lp=True):
+def search_urls(query, site=None, limit=10):
+    """
+    DuckDuckGo search, restricted to `site` when given.
+
+    Returns:
+        List of result URLs, or None if the search failed
+    """
     if site:
         search_query = f"site:{site} {query}"
     else:
@@ -76,6 +134,19 @@ def browser(query, site=None, limit=10, scrape_lp=True):
                     else:
                         all_urls.append(url)
     except Exception:
+        return None
+    return all_urls
+
+def browser_result(product_pages, limit):
+    return {
+        "success": True if product_pages else False,
+        "message": "URLs fetched successfully" if product_pages else "No product URLs found",
+        "urls": list(product_pages)[:limit]
+    }
+
+def browser(query, site=None, limit=10, scrape_lp=True):
+    all_urls = search_urls(query, site, limit)
+    if all_urls is None:
         return {"success": False, "message": "Error during search", "urls": []}
 
     product_pages, list_pages = categorize_urls(all_urls, site)
@@ -90,8 +161,19 @@ def browser(query, site=None, limit=10, scrape_lp=True):
                 scraped_products.update(new_products)
         product_pages = list(scraped_products)[:limit]
 
-    return {
-        "success": True if product_pages else False,
-        "message": "URLs fetched successfully" if product_pages else "No product URLs found",
-        "urls": list(product_pages)[:limit]
-    }
\ No newline at end of file
+    return browser_result(product_pages, limit)
+
+async def abrowser(query, site=None, limit=10, scrape_lp=True):
+    """Async browser(): listing pages are expanded concurrently and stop early once `limit` is reached."""
+    # DDGS search is synchronous - run it off the event loop
+    all_urls = await asyncio.to_thread(search_urls, query, site, limit)
+    if all_urls is None:
+        return {"success": False, "message": "Error during search", "urls": []}
+
+    product_pages, list_pages = categorize_urls(all_urls, site)
+
+    if len(product_pages) < limit and scrape_lp and list_pages:
+        scraped_products = await expand_list_pages(list_pages, site, needed=limit, known=product_pages)
+        product_pages = list(scraped_products)[:limit]
+
+    return browser_result(product_pages, limit)
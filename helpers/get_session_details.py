@@ -1,40 +1,94 @@
-from prisma import Prisma
+from core.database import prisma
+from helpers.redis_functions import get_cached_session, cache_session, get_chat_history
+from helpers import metrics
+from core.config import CHAT_HISTORY_MAX_MESSAGES, CHAT_HISTORY_WINDOW
 
-prisma = Prisma()
 
-async def get_session_details(session_id: str, user_id: str):
-    try:
-        # Connect to database if not connected
-        if not prisma.is_connected():
-            await prisma.connect()
-        
-        # Get session with messages
-        session = await prisma.chat_sessions.find_first(
-            where={
-                "id": session_id,
-                "user_id": user_id
-            },
-            include={
-                "users": False,
-                "chat_messages": {
-                    "include": {
-                        "users": False,
-                    },
-                    "order_by": {
-                        "created_at": "asc"
-                    }
-                }
+SESSION_FIELDS = ("id", "user_id", "current_url", "current_domain", "created_at", "last_activity")
+
+
+def session_cache_record(session: dict) -> dict:
+    """The session fields kept in Redis (everything but the messages)."""
+    return {field: session.get(field) for field in SESSION_FIELDS}
+
+
+def chat_cache_record(message: dict) -> dict:
+    """A chat message in the shape the Redis chat history list uses."""
+    return {
+        "message": message.get("message"),
+        "message_type": message.get("message_type"),
+        "detected_intent": message.get("detected_intent"),
+        "created_at": message.get("created_at"),
+    }
+
+
+async def load_session_from_db(session_id: str, user_id: str):
+    """
+    Load a session and its most recent messages from Postgres, then backfill the Redis cache.
+    If Redis still has the session's chat history, that list is kept and returned instead:
+    it may hold turns that haven't reached Postgres yet.
+
+    Returns:
+        (session dict without messages, messages oldest first)
+    """
+    # Get session with its latest messages
+    session = await prisma.chat_sessions.find_first(
+        where={
+            "id": session_id,
+            "user_id": user_id
+        },
+        include={
+            "users": False,
+            "chat_messages": {
+                "include": {
+                    "users": False,
+                },
+                "order_by": {
+                    "created_at": "desc"
+                },
+                "take": CHAT_HISTORY_MAX_MESSAGES
             }
-        )
-        
-        if not session:
-            raise ValueError(f"Session not found for session_id: {session_id}")
-        
-        return session.model_dump(mode='json')
-        
+        }
+    )
+
+    if not session:
+        raise ValueError(f"Session not found for session_id: {session_id}")
+
+    session = session.model_dump(mode='json')
+    messages = [chat_cache_record(msg) for msg in reversed(session.get("chat_messages") or [])]
+    record = session_cache_record(session)
+    cached = await cache_session(record, messages)
+    if cached["status"] == "success" and not cached["backfilled"]:
+        messages = await get_chat_history(session_id)
+    return record, messages
+
+
+async def get_session_details(session_id: str, user_id: str, history_limit: int = CHAT_HISTORY_WINDOW):
+    """
+    Session metadata plus its last `history_limit` messages, read through the Redis cache.
+    Postgres is only queried when the session isn't cached, so the cost of a query
+    doesn't grow with the length of the conversation.
+
+    Returns:
+        Session dict with chat_messages (oldest first)
+    """
+    try:
+        session = await get_cached_session(session_id)
+        if session:
+            if session.get("user_id") != user_id:
+                raise ValueError(f"Session not found for session_id: {session_id}")
+            metrics.incr("session_cache.hits")
+            session["chat_messages"] = await get_chat_history(session_id, limit=history_limit)
+            return session
+
+        metrics.incr("session_cache.misses")
+        session, messages = await load_session_from_db(session_id, user_id)
+        session["chat_messages"] = messages[-history_limit:] if history_limit else messages
+        return session
+
     except ValueError as e:
         print(f"[ERROR] {e}")
         raise
     except Exception as e:
         print(f"[ERROR] Failed to get session details: {e}")
-        raise
\ No newline at end of file
+        raise
@@ -0,0 +1,325 @@
+from html.parser import HTMLParser
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+# Elements that never get an end tag
+VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr",
+})
+# Text inside these isn't page text - BeautifulSoup's get_text() skips it too
+HIDDEN_TAGS = frozenset({"script", "style", "template"})
+
+
+class Rule(NamedTuple):
+    """
+    An element to capture while walking the page. Like soup.find(tags, {attr: value}), the
+    FIRST matching element in document order wins, and its get_text(strip=True) is kept.
+
+    attr "class" matches when value is one of the element's classes; any other attr
+    ("id", "data-testid", ...) must be equal to value. `within` restricts matches to the
+    inside of the element captured by another rule.
+    """
+    name: str
+    tags: Sequence[str]
+    attr: str
+    value: str
+    within: Optional[str] = None
+
+
+class PageExtract(NamedTuple):
+    """
+    Everything extract() collected in its single walk over the page.
+
+    fields: rule name -> stripped text of the rule's element (missing if nothing matched)
+    blocks: stripped text of every block_tags element, in document order (empty ones included)
+    strings: every visible text node in document order, as soup.get_text() would join them
+    """
+    fields: Dict[str, str]
+    blocks: List[str]
+    strings: List[str]
+    backend: str
+
+    def text(self, separator: str = "", strip: bool = False) -> str:
+        """Page text, like soup.get_text(separator, strip)."""
+        if strip:
+            return separator.join(s.strip() for s in self.strings if s.strip())
+        return separator.join(self.strings)
+
+
+class _Collector:
+    """
+    Receives start/end/data events from a parser backend and fills a PageExtract.
+    Every open capture (a matched rule or a block element) gets each visible string
+    as it streams past, so nothing is ever looked up in a tree afterwards.
+    """
+
+    def __init__(self, rules: Sequence[Rule], block_tags: Sequence[str]):
+        self.rules_by_tag: Dict[str, List[Rule]] = {}
+        for rule in rules:
+            for tag in rule.tags:
+                self.rules_by_tag.setdefault(tag, []).append(rule)
+        self.block_tags = frozenset(block_tags)
+        self.fields: Dict[str, str] = {}
+        self.blocks: List[str] = []
+        self.strings: List[str] = []
+        # (tag, [(field name or block index, parts)]) per open element
+        self.stack: List[tuple] = []
+        self.open_captures: List[List[str]] = []
+        self.open_rules: set = set()
+        self.hidden = 0
+        # Parsers may split one text node (lxml does around entities) - join the pieces first
+        self.pending: List[str] = []
+
+    def start(self, tag: str, attrs):
+        """attrs: a dict or a callable returning one, only called when a rule could match."""
+        if self.pending:
+            self._flush_text()
+        captures = []
+        rules = self.rules_by_tag.get(tag)
+        if rules:
+            attrs = attrs() if callable(attrs) else attrs
+            for rule in rules:
+                if rule.name in self.fields or (rule.within and rule.within not in self.open_rules):
+                    continue
+                actual = attrs.get(rule.attr)
+                if actual is None:
+                    continue
+                matched = rule.value in actual.split() if rule.attr == "class" else actual == rule.value
+                if matched:
+                    # Claim the rule now so a nested element of the same kind can't take it
+                    self.fields[rule.name] = ""
+                    self.open_rules.add(rule.name)
+                    captures.append((rule.name, []))
+        if tag in self.block_tags:
+            self.blocks.append("")
+            captures.append((len(self.blocks) - 1, []))
+        for _, parts in captures:
+            self.open_captures.append(parts)
+        if tag in HIDDEN_TAGS:
+            self.hidden += 1
+        self.stack.append((tag, captures))
+
+    def end(self, tag: str):
+        if self.pending:
+            self._flush_text()
+        # Stray end tags are ignored and unclosed children are closed with their parent,
+        # the same way BeautifulSoup's html.parser tree builder handles them
+        for depth in range(len(self.stack) - 1, -1, -1):
+            if self.stack[depth][0] == tag:
+                break
+        else:
+            return
+        while len(self.stack) > depth:
+            self._close()
+
+    def data(self, text: str):
+        if not self.hidden:
+            self.pending.append(text)
+
+    def comment(self):
+        # Comments aren't text, but they do separate the text nodes around them
+        if self.pending:
+            self._flush_text()
+
+    def _flush_text(self):
+        text = self.pending[0] if len(self.pending) == 1 else "".join(self.pending)
+        self.pending = []
+        self.strings.append(text)
+        if self.open_captures:
+            stripped = text.strip()
+            if stripped:
+                for parts in self.open_captures:
+                    parts.append(stripped)
+
+    def close(self) -> "_Collector":
+        if self.pending:
+            self._flush_text()
+        while self.stack:
+            self._close()
+        return self
+
+    def _close(self):
+        tag, captures = self.stack.pop()
+        if tag in HIDDEN_TAGS:
+            self.hidden -= 1
+        for key, parts in reversed(captures):
+            self.open_captures.pop()
+            if isinstance(key, int):
+                self.blocks[key] = "".join(parts)
+            else:
+                self.fields[key] = "".join(parts)
+                self.open_rules.discard(key)
+
+
+class ParserBackend:
+    """Parses HTML into start/end/data events for a _Collector, without keeping a tree around."""
+
+    name = "base"
+
+    def feed(self, html: str, collector: _Collector):
+        raise NotImplementedError
+
+
+class _StdlibEvents(HTMLParser):
+    def __init__(self, collector: _Collector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+
+    def handle_starttag(self, tag, attrs):
+        self.collector.start(tag, lambda: {name: value or "" for name, value in attrs})
+        if tag in VOID_TAGS:
+            self.collector.end(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.collector.start(tag, lambda: {name: value or "" for name, value in attrs})
+        self.collector.end(tag)
+
+    def handle_endtag(self, tag):
+        if tag not in VOID_TAGS:
+            self.collector.end(tag)
+
+    def handle_data(self, data):
+        self.collector.data(data)
+
+    def handle_comment(self, data):
+        self.collector.comment()
+
+
+class StdlibBackend(ParserBackend):
+    """Python's html.parser - always available, the slowest."""
+
+    name = "html.parser"
+
+    def feed(self, html: str, collector: _Collector):
+        parser = _StdlibEvents(collector)
+        parser.feed(html)
+        parser.close()
+
+
+class _LxmlTarget:
+    def __init__(self, collector: _Collector):
+        self.collector = collector
+
+    def start(self, tag, attrib):
+        self.collector.start(tag, attrib)
+
+    def end(self, tag):
+        self.collector.end(tag)
+
+    def data(self, data):
+        self.collector.data(data)
+
+    def comment(self, text):
+        self.collector.comment()
+
+    def close(self):
+        return None
+
+
+class LxmlBackend(ParserBackend):
+    """libxml2's HTML parser streaming SAX-style events into the collector - no tree is built."""
+
+    name = "lxml"
+
+    def __init__(self):
+        from lxml import etree
+        self.etree = etree
+
+    def feed(self, html: str, collector: _Collector):
+        parser = self.etree.HTMLParser(target=_LxmlTarget(collector), recover=True)
+        parser.feed(html)
+        parser.close()
+
+
+class SelectolaxBackend(ParserBackend):
+    """Lexbor (via selectolax) - parses fastest; the tree is walked once, iteratively."""
+
+    name = "selectolax"
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self.parser_class = LexborHTMLParser
+
+    def feed(self, html: str, collector: _Collector):
+        root = self.parser_class(html).root
+        if root is None:
+            return
+        collector.start(root.tag, root.attributes)
+        stack = [(root.tag, root.iter(include_text=True))]
+        while stack:
+            node = next(stack[-1][1], None)
+            if node is None:
+                collector.end(stack.pop()[0])
+                continue
+            tag = node.tag
+            if tag == "-text":
+                collector.data(node.text(deep=False))
+            elif tag == "-comment":
+                collector.comment()
+            elif not tag.startswith("-"):
+                collector.start(tag, lambda: {name: value or "" for name, value in node.attributes.items()})
+                stack.append((tag, node.iter(include_text=True)))
+
+
+def create_parser_backend(kind: str) -> ParserBackend:
+    """
+    Build an HTML parser backend.
+
+    Args:
+        kind: "selectolax", "lxml" or "html.parser"
+
+    Raises:
+        ImportError if the backend's package isn't installed
+    """
+    if kind == "selectolax":
+        return SelectolaxBackend()
+    if kind == "lxml":
+        return LxmlBackend()
+    if kind == "html.parser":
+        return StdlibBackend()
+    raise ValueError(f"Unknown HTML parser backend: {kind}. Must be auto/selectolax/lxml/html.parser")
+
+
+def available_backends() -> List[str]:
+    """Installed backends, fastest first."""
+    names = []
+    for kind in ("selectolax", "lxml", "html.parser"):
+        try:
+            create_parser_backend(kind)
+            names.append(kind)
+        except ImportError:
+            continue
+    return names
+
+
+_backends: Dict[str, ParserBackend] = {}
+
+
+def get_parser_backend(kind: str = "auto") -> ParserBackend:
+    """Cached backend for `kind`; "auto" (or a backend that isn't installed) picks the fastest installed one."""
+    if kind not in _backends:
+        try:
+            backend = create_parser_backend(available_backends()[0] if kind == "auto" else kind)
+        except ImportError as e:
+            print(f"[WARNING] HTML parser backend '{kind}' unavailable ({e}), falling back")
+            backend = create_parser_backend(available_backends()[0])
+        print(f"[SCRAPER] Using HTML parser backend: {backend.name}")
+        _backends[kind] = backend
+    return _backends[kind]
+
+
+def extract(html: str, rules: Sequence[Rule] = (), block_tags: Sequence[str] = (), backend: str = "auto") -> PageExtract:
+    """
+    Walk `html` once, capturing the first element for every rule, the text of every
+    block_tags element and the visible page text.
+
+    Args:
+        html: Page HTML
+        rules: Elements to capture
+        block_tags: Tags whose text is collected in document order (e.g. headings and paragraphs)
+        backend: Parser backend, see get_parser_backend()
+    """
+    parser = get_parser_backend(backend)
+    collector = _Collector(rules, block_tags)
+    parser.feed(html, collector)
+    collector.close()
+    return PageExtract(collector.fields, collector.blocks, collector.strings, parser.name)
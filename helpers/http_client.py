@@ -0,0 +1,187 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+import httpx
+from helpers import metrics
+from core.config import (
+    HTTP_HTTP2,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_CONNECTIONS_PER_HOST,
+    HTTP_KEEPALIVE_SECONDS,
+    HTTP_TIMEOUT_SECONDS,
+    HTTP_CONNECT_TIMEOUT_SECONDS,
+)
+
+# AGGRESSIVE headers to bypass bot detection
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Cache-Control': 'max-age=0',
+    'sec-ch-ua': '"Google Chrome";v="131", "Chromium";v="131", "Not_A Brand";v="24"',
+    'sec-ch-ua-mobile': '?0',
+    'sec-ch-ua-platform': '"Windows"',
+}
+
+
+def _http2_available() -> bool:
+    if HTTP_HTTP2 != "on":
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        print("[WARNING] HTTP_HTTP2 is on but the h2 package is missing (pip install 'httpx[http2]'), using HTTP/1.1")
+        return False
+
+
+_http2 = _http2_available()
+_limits = httpx.Limits(
+    max_connections=HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+    keepalive_expiry=HTTP_KEEPALIVE_SECONDS,
+)
+_timeout = httpx.Timeout(HTTP_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS)
+
+# One pooled client per flavour for the whole process: connections (and TLS sessions)
+# to a retailer are reused across requests instead of re-handshaking every time
+async_client = httpx.AsyncClient(headers=HEADERS, http2=_http2, limits=_limits, timeout=_timeout, follow_redirects=True)
+sync_client = httpx.Client(headers=HEADERS, http2=_http2, limits=_limits, timeout=_timeout, follow_redirects=True)
+
+# httpx only caps connections globally, so cap concurrent requests per host ourselves
+_async_host_slots: Dict[str, asyncio.Semaphore] = {}
+_sync_host_slots: Dict[str, threading.BoundedSemaphore] = {}
+_sync_host_slots_lock = threading.Lock()
+
+
+class FetchTimer:
+    """
+    Collects httpcore trace events for one request and turns them into a timing breakdown:
+
+    - wait_ms: waiting for a per-host slot
+    - connect_ms: TCP connect + TLS handshake (0 when a pooled connection was reused)
+    - ttfb_ms: request sent until response headers received
+    - download_ms: response headers until the body is fully read
+    With redirects, connect/ttfb describe the final hop and total_ms covers all of them.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.acquired = self.start
+        self.end = None
+        self.marks: Dict[str, float] = {}
+
+    def on_event(self, name: str, info: Dict[str, Any]):
+        # "http11.send_request_headers.started" / "http2...." -> "send_request_headers.started"
+        protocol, _, event = name.partition(".")
+        self.marks[event if protocol in ("http11", "http2") else name] = time.perf_counter()
+
+    async def atrace(self, name: str, info: Dict[str, Any]):
+        self.on_event(name, info)
+
+    def _span(self, begin: str, finish: str) -> float:
+        if begin in self.marks and finish in self.marks:
+            return (self.marks[finish] - self.marks[begin]) * 1000
+        return 0.0
+
+    def timing(self) -> Dict[str, Any]:
+        end = self.end or time.perf_counter()
+        connected = "connection.start_tls.complete" if "connection.start_tls.complete" in self.marks else "connection.connect_tcp.complete"
+        headers_done = self.marks.get("receive_response_headers.complete", end)
+        return {
+            "wait_ms": (self.acquired - self.start) * 1000,
+            "connect_ms": self._span("connection.connect_tcp.started", connected),
+            "ttfb_ms": self._span("send_request_headers.started", "receive_response_headers.complete"),
+            "download_ms": (end - headers_done) * 1000,
+            "total_ms": (end - self.start) * 1000,
+            "reused_connection": "connection.connect_tcp.started" not in self.marks,
+        }
+
+
+def _record(host: str, timing: Dict[str, Any], response: Optional[httpx.Response]):
+    for name in ("wait_ms", "connect_ms", "ttfb_ms", "download_ms", "total_ms"):
+        metrics.observe(f"http.{host}.{name}", timing[name])
+    metrics.incr(f"http.{host}.reused" if timing["reused_connection"] else f"http.{host}.new_connections")
+    status = response.status_code if response is not None else "ERR"
+    version = response.http_version if response is not None else "-"
+    print(
+        f"[HTTP] GET {host} {status} {version} wait={timing['wait_ms']:.0f}ms connect={timing['connect_ms']:.0f}ms "
+        f"ttfb={timing['ttfb_ms']:.0f}ms download={timing['download_ms']:.0f}ms"
+    )
+
+
+async def afetch(url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None) -> httpx.Response:
+    """
+    GET `url` through the shared async pool, at most HTTP_MAX_CONNECTIONS_PER_HOST at a time per host.
+    The timing breakdown is attached to the response as `response.timing`.
+
+    Raises:
+        httpx.HTTPError on network errors (status codes are left to the caller)
+    """
+    host = urlsplit(url).hostname or "unknown"
+    if host not in _async_host_slots:
+        _async_host_slots[host] = asyncio.Semaphore(HTTP_MAX_CONNECTIONS_PER_HOST)
+    timer = FetchTimer()
+    response = None
+    try:
+        async with _async_host_slots[host]:
+            timer.acquired = time.perf_counter()
+            response = await async_client.get(
+                url,
+                headers=headers,
+                timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+                extensions={"trace": timer.atrace},
+            )
+        return response
+    except httpx.HTTPError:
+        metrics.incr(f"http.{host}.errors")
+        raise
+    finally:
+        timer.end = time.perf_counter()
+        timing = timer.timing()
+        if response is not None:
+            response.timing = timing
+        _record(host, timing, response)
+
+
+def fetch(url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None) -> httpx.Response:
+    """Blocking counterpart of afetch() for code running in worker threads."""
+    host = urlsplit(url).hostname or "unknown"
+    with _sync_host_slots_lock:
+        if host not in _sync_host_slots:
+            _sync_host_slots[host] = threading.BoundedSemaphore(HTTP_MAX_CONNECTIONS_PER_HOST)
+    timer = FetchTimer()
+    response = None
+    try:
+        with _sync_host_slots[host]:
+            timer.acquired = time.perf_counter()
+            response = sync_client.get(
+                url,
+                headers=headers,
+                timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+                extensions={"trace": timer.on_event},
+            )
+        return response
+    except httpx.HTTPError:
+        metrics.incr(f"http.{host}.errors")
+        raise
+    finally:
+        timer.end = time.perf_counter()
+        timing = timer.timing()
+        if response is not None:
+            response.timing = timing
+        _record(host, timing, response)
+
+
+async def aclose_clients():
+    await async_client.aclose()
+    sync_client.close()
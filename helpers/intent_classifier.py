@@ -0,0 +1,108 @@
+import re
+import asyncio
+import numpy as np
+from typing import List, Optional, Tuple, NamedTuple
+from helpers.embedder import agenerate_embedding, agenerate_embeddings
+from prompts.intent_exemplars import intent_exemplars
+
+
+class LocalIntent(NamedTuple):
+    intent: str
+    scope: str
+    confidence: float
+    tier: str  # "rules" or "centroid"
+
+
+# Tier 1: high-precision patterns, checked in order (actions before questions).
+# Anything they don't clearly cover falls through to the centroid tier.
+_DEICTIC = r"\b(this|these|it|here|those|them|the ones)\b"
+RULES: List[Tuple[re.Pattern, str, str]] = [
+    (re.compile(r"\b(wish ?list|favou?rites)\b|\bsave (this |it )?for later\b"), "todo", "wishlist"),
+    (re.compile(r"\b(add|put|move)\b.*\b(cart|bag|basket)\b"), "todo", "cart"),
+    (re.compile(r"\b(remove|delete|empty|clear)\b.*\b(cart|bag|basket)\b"), "todo", "cart"),
+    (re.compile(r"\b(place|cancel|track|return)\b.*\border\b|\bwhere is my order\b"), "todo", "order"),
+    (re.compile(r"\b(change|update|reset)\b.*\b(password|address|email|phone( number)?|profile)\b"), "todo", "account"),
+    (re.compile(r"\byou (showed|mentioned|recommended|suggested|gave|said)\b|\b(earlier|previously|we discussed)\b"), "ask", "chat_history"),
+    (re.compile(r"\b(similar|alternatives?|cheaper options|other options)\b"), "ask", "product"),
+    (re.compile(r"\bthis\b"), "ask", "current_page"),
+    (re.compile(r"^(what('?s| is| are)|is|does|how (much|many))\b.*\b(price|cost|discount|offer|stock|available|availability|rating|reviews?|size|colou?r|material|delivery|warranty|return policy)\b"), "ask", "current_page"),
+]
+# Product search is only unambiguous when nothing points at an existing item
+PRODUCT_SEARCH = re.compile(r"^(find|search( for)?|show me|looking for|i'?m looking for|i need|i want|recommend)\b")
+
+
+def classify_by_rules(user_query: str) -> Optional[LocalIntent]:
+    query = " ".join(user_query.lower().split())
+    for pattern, intent, scope in RULES:
+        if pattern.search(query):
+            return LocalIntent(intent, scope, 1.0, "rules")
+    if PRODUCT_SEARCH.search(query) and not re.search(_DEICTIC, query):
+        return LocalIntent("ask", "product", 1.0, "rules")
+    return None
+
+
+class CentroidClassifier:
+    """
+    Nearest-centroid classifier over embeddings of the labeled exemplars in
+    prompts/intent_exemplars. Confidence is the cosine similarity to the best
+    centroid, and a prediction also needs a clear margin over the runner-up.
+    """
+
+    def __init__(self, exemplars):
+        self.exemplars = exemplars
+        self.labels: List[Tuple[str, str]] = list(exemplars.keys())
+        self.centroids: Optional[np.ndarray] = None
+        self._lock = asyncio.Lock()
+
+    async def _ensure_centroids(self):
+        if self.centroids is not None:
+            return
+        async with self._lock:
+            if self.centroids is not None:
+                return
+            texts = [text for label in self.labels for text in self.exemplars[label]]
+            embeddings = np.asarray(await agenerate_embeddings(texts), dtype=np.float32)
+            centroids = []
+            offset = 0
+            for label in self.labels:
+                count = len(self.exemplars[label])
+                centroid = embeddings[offset:offset + count].mean(axis=0)
+                centroids.append(centroid / np.linalg.norm(centroid))
+                offset += count
+            self.centroids = np.vstack(centroids)
+
+    async def scores(self, user_query: str, query_embedding: Optional[List[float]] = None) -> List[Tuple[Tuple[str, str], float]]:
+        """All (label, similarity) pairs, best first."""
+        await self._ensure_centroids()
+        if query_embedding is None:
+            query_embedding = await agenerate_embedding(user_query)
+        similarities = self.centroids @ np.asarray(query_embedding, dtype=np.float32)
+        order = np.argsort(-similarities)
+        return [(self.labels[i], float(similarities[i])) for i in order]
+
+    async def classify(self, user_query: str, min_similarity: float, min_margin: float,
+                       query_embedding: Optional[List[float]] = None) -> Optional[LocalIntent]:
+        ranked = await self.scores(user_query, query_embedding)
+        (intent, scope), best = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else -1.0
+        if best < min_similarity or best - runner_up < min_margin:
+            return None
+        return LocalIntent(intent, scope, best, "centroid")
+
+
+centroid_classifier = CentroidClassifier(intent_exemplars)
+
+
+async def classify_intent_locally(user_query: str, min_similarity: float, min_margin: float) -> Optional[LocalIntent]:
+    """
+    Try to classify without an LLM call: rules first, then the centroid classifier.
+
+    Returns:
+        LocalIntent when a tier is confident enough, otherwise None (ask the LLM)
+    """
+    if not user_query or not user_query.strip():
+        return None
+    local = classify_by_rules(user_query)
+    if local:
+        return local
+    return await centroid_classifier.classify(user_query, min_similarity, min_margin)
@@ -2,8 +2,10 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.config import llm_keys
-from langchain_google_genai import ChatGoogleGenerativeAI
+from helpers.llm_clients import get_llm
+from helpers.intent_classifier import classify_intent_locally
+from helpers import metrics
+from core.config import INTENT_LOCAL_CLASSIFIER, INTENT_MIN_SIMILARITY, INTENT_MIN_MARGIN
 from langchain_core.messages import HumanMessage, SystemMessage
 from prompts.intent_detection import intent_detection_prompt
 from pydantic import BaseModel, Field
@@ -16,22 +18,33 @@ class IntentOutput(BaseModel):
     scope: Literal["current_page", "product", "cart", "order", "wishlist", "account", "chat_history", "unknown"] = Field(description="The scope of the intent")
     message_forward: str = Field(description="String that will be passed to the next AI agent")
 
-def intent_detection(user_query: str):
+async def intent_detection(user_query: str, allow_local: bool = True):
+    """
+    Classify the query, trying the local rules/centroid classifier before Gemini.
+
+    Args:
+        user_query: The user's message
+        allow_local: Set False to always ask the LLM (used by the offline evaluation)
+
+    Returns:
+        IntentOutput
+    """
     # Get user input
     user_input = user_query
 
-    # Initialize the Gemini Model
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        temperature=0.7,
-        max_tokens=None,
-        timeout=None,
-        max_retries=2,
-        api_key=llm_keys.gemini
-    )
-
-    # Apply structured output to the model
-    structured_llm = llm.with_structured_output(IntentOutput)
+    if allow_local and INTENT_LOCAL_CLASSIFIER == "on":
+        try:
+            local = await classify_intent_locally(user_query, INTENT_MIN_SIMILARITY, INTENT_MIN_MARGIN)
+        except Exception as e:
+            print(f"[WARNING] Local intent classifier failed, using LLM: {e}")
+            local = None
+        if local:
+            metrics.incr(f"intent.{local.tier}_hits")
+            return IntentOutput(intent=local.intent, scope=local.scope, message_forward=user_query)
+    metrics.incr("intent.llm_calls")
+
+    # Shared Gemini client with structured output, built once per process
+    structured_llm = get_llm("gemini-2.5-flash", temperature=0.7).with_structured_output(IntentOutput)
     messages = []
 
     # Add system prompt and user input
@@ -39,6 +52,6 @@ def intent_detection(user_query: str):
     messages.append(HumanMessage(content=user_input))
 
     # Invoke the model and get structured output
-    response = structured_llm.invoke(messages)
+    response = await structured_llm.ainvoke(messages)
 
     return response
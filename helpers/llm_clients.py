@@ -0,0 +1,139 @@
+import asyncio
+import time
+from typing import Dict, Tuple, Any, AsyncIterator
+from langchain_google_genai import ChatGoogleGenerativeAI
+from core.config import llm_keys, LLM_TIMEOUT_SECONDS, LLM_MAX_CONCURRENCY, LLM_CONCURRENCY_LIMITS, LLM_MAX_RETRIES
+from helpers import metrics
+
+DEFAULT_MODEL = "gemini-2.5-flash"
+# The Gemini client retries failed attempts itself, sleeping 2s, 4s, ... (capped at 60s) in between
+RETRY_BACKOFF_CAP_SECONDS = 60
+
+
+def call_deadline(timeout: float, max_retries: int) -> float:
+    """Longest a call with client-side retries may legitimately take: every attempt plus the sleeps between them."""
+    backoff = sum(min(2 ** (attempt + 1), RETRY_BACKOFF_CAP_SECONDS) for attempt in range(max_retries))
+    return timeout * (max_retries + 1) + backoff
+
+
+class PooledLLM:
+    """
+    A long-lived chat model behind a per-model concurrency limit.
+
+    Every call waits for a slot (recorded as queueing delay), runs with a
+    deadline and updates the in-flight/queued gauges on /metrics. Instances
+    for the same model share one slot pool, whatever runnable they wrap.
+
+    `timeout` bounds one attempt (the runnable enforces it and retries), `deadline`
+    the whole call including those retries - see call_deadline().
+    """
+
+    def __init__(self, model: str, runnable, semaphore: asyncio.Semaphore, timeout: float, deadline: float):
+        self.model = model
+        self.runnable = runnable
+        self.semaphore = semaphore
+        self.timeout = timeout
+        self.deadline = deadline
+        self._structured: Dict[Any, "PooledLLM"] = {}
+
+    def with_structured_output(self, schema) -> "PooledLLM":
+        """Same pool, but the model returns `schema` instances. Built once per schema."""
+        if schema not in self._structured:
+            self._structured[schema] = PooledLLM(
+                self.model, self.runnable.with_structured_output(schema), self.semaphore, self.timeout, self.deadline
+            )
+        return self._structured[schema]
+
+    async def _acquire(self):
+        _pool_stats[self.model]["queued"] += 1
+        metrics.set_gauge(f"llm.{self.model}.queued", _pool_stats[self.model]["queued"])
+        start = time.perf_counter()
+        try:
+            await self.semaphore.acquire()
+        finally:
+            _pool_stats[self.model]["queued"] -= 1
+            metrics.set_gauge(f"llm.{self.model}.queued", _pool_stats[self.model]["queued"])
+        metrics.observe(f"llm.{self.model}.queue_wait_ms", (time.perf_counter() - start) * 1000)
+        _pool_stats[self.model]["in_flight"] += 1
+        metrics.set_gauge(f"llm.{self.model}.in_flight", _pool_stats[self.model]["in_flight"])
+
+    def _release(self):
+        _pool_stats[self.model]["in_flight"] -= 1
+        metrics.set_gauge(f"llm.{self.model}.in_flight", _pool_stats[self.model]["in_flight"])
+        self.semaphore.release()
+
+    async def ainvoke(self, messages):
+        await self._acquire()
+        start = time.perf_counter()
+        try:
+            metrics.incr(f"llm.{self.model}.calls")
+            return await asyncio.wait_for(self.runnable.ainvoke(messages), self.deadline)
+        except asyncio.TimeoutError:
+            metrics.incr(f"llm.{self.model}.timeouts")
+            raise
+        except Exception:
+            metrics.incr(f"llm.{self.model}.errors")
+            raise
+        finally:
+            metrics.observe(f"llm.{self.model}.latency_ms", (time.perf_counter() - start) * 1000)
+            self._release()
+
+    async def astream(self, messages) -> AsyncIterator[Any]:
+        """
+        Stream chunks. The first chunk may take the whole deadline (failed attempts are
+        retried before anything streams); after that, each next chunk must come within timeout.
+        """
+        await self._acquire()
+        start = time.perf_counter()
+        try:
+            metrics.incr(f"llm.{self.model}.calls")
+            stream = self.runnable.astream(messages).__aiter__()
+            wait = self.deadline
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(stream.__anext__(), wait)
+                except StopAsyncIteration:
+                    break
+                wait = self.timeout
+                yield chunk
+        except asyncio.TimeoutError:
+            metrics.incr(f"llm.{self.model}.timeouts")
+            raise
+        except Exception:
+            metrics.incr(f"llm.{self.model}.errors")
+            raise
+        finally:
+            metrics.observe(f"llm.{self.model}.latency_ms", (time.perf_counter() - start) * 1000)
+            self._release()
+
+
+_clients: Dict[Tuple[str, float], PooledLLM] = {}
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+_pool_stats: Dict[str, Dict[str, int]] = {}
+
+
+def get_llm(model: str = DEFAULT_MODEL, temperature: float = 0.7) -> PooledLLM:
+    """
+    Shared client for a (model, temperature) pair. The underlying
+    ChatGoogleGenerativeAI (and its HTTP connections) lives for the whole process.
+    """
+    key = (model, temperature)
+    if key not in _clients:
+        if model not in _semaphores:
+            limit = LLM_CONCURRENCY_LIMITS.get(model, LLM_MAX_CONCURRENCY)
+            _semaphores[model] = asyncio.Semaphore(limit)
+            _pool_stats[model] = {"queued": 0, "in_flight": 0}
+            metrics.set_gauge(f"llm.{model}.limit", limit)
+
+        llm = ChatGoogleGenerativeAI(
+            model=model,
+            temperature=temperature,
+            max_tokens=None,
+            timeout=LLM_TIMEOUT_SECONDS,
+            max_retries=LLM_MAX_RETRIES,
+            api_key=llm_keys.gemini
+        )
+        _clients[key] = PooledLLM(
+            model, llm, _semaphores[model], LLM_TIMEOUT_SECONDS, call_deadline(LLM_TIMEOUT_SECONDS, LLM_MAX_RETRIES)
+        )
+    return _clients[key]
@@ -0,0 +1,39 @@
+import threading
+from typing import Dict, Any
+
+# Process-local counters, gauges and timings exposed on GET /metrics
+_lock = threading.Lock()
+_counters: Dict[str, float] = {}
+_gauges: Dict[str, float] = {}
+_timings: Dict[str, Dict[str, float]] = {}
+
+
+def incr(name: str, amount: float = 1):
+    """Increase a monotonically growing counter."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def set_gauge(name: str, value: float):
+    """Record the current value of something that goes up and down (queue depth, bytes in use)."""
+    with _lock:
+        _gauges[name] = value
+
+
+def observe(name: str, value_ms: float):
+    """Record one duration sample in milliseconds."""
+    with _lock:
+        timing = _timings.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        timing["count"] += 1
+        timing["total_ms"] += value_ms
+        timing["max_ms"] = max(timing["max_ms"], value_ms)
+
+
+def snapshot() -> Dict[str, Any]:
+    """Copy of every metric, with average durations filled in."""
+    with _lock:
+        timings = {
+            name: {**timing, "avg_ms": timing["total_ms"] / timing["count"] if timing["count"] else 0.0}
+            for name, timing in _timings.items()
+        }
+        return {"counters": dict(_counters), "gauges": dict(_gauges), "timings": timings}
@@ -0,0 +1,113 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+from helpers import metrics
+from core.config import PARSE_POOL_WORKERS, PARSE_POOL_MAX_TASKS_PER_CHILD, PARSE_POOL_MIN_BYTES
+
+
+def _warm_up() -> bool:
+    # Runs in each worker: pay for the parsing modules' imports before the first real page
+    import helpers.web_scrapper  # noqa: F401
+    import helpers.get_product_urls  # noqa: F401
+    return True
+
+
+class ParsePool:
+    """
+    Runs CPU-bound HTML parsing in worker processes, so a multi-megabyte page doesn't hold
+    the API worker's GIL and stall every other request in the process.
+
+    At most `workers` pages are in the pool at once; the rest wait in order, which is what
+    the parse_pool.queue_depth gauge shows. Workers are replaced after max_tasks_per_child
+    pages to cap memory growth. Pages under min_bytes are parsed in a thread instead, where
+    pickling them to another process would cost more than it saves.
+    """
+
+    def __init__(self, workers: int, max_tasks_per_child: int, min_bytes: int):
+        self.workers = workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self.min_bytes = min_bytes
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._queued = 0
+        self._busy = 0
+
+    def start(self):
+        """Spawn the workers. Called from the lifespan; run() also starts the pool on first use."""
+        if self.workers <= 0 or self._executor is not None:
+            return
+        # spawn, not fork: forking a process with live event loops, sockets and model threads isn't safe
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=self.max_tasks_per_child or None,
+        )
+        for _ in range(self.workers):
+            self._executor.submit(_warm_up)
+        print(f"[LOG] Parse pool started with {self.workers} workers (recycled every {self.max_tasks_per_child} pages)")
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _is_small(self, html) -> bool:
+        """Whether the page is under min_bytes once UTF-8 encoded, without encoding big pages."""
+        if isinstance(html, (bytes, bytearray)):
+            return len(html) < self.min_bytes
+        # A character takes 1 to 4 bytes, so only a page in between needs encoding to tell
+        if len(html) >= self.min_bytes:
+            return False
+        if len(html) * 4 < self.min_bytes:
+            return True
+        return len(html.encode("utf-8", errors="ignore")) < self.min_bytes
+
+    def _gauges(self):
+        metrics.set_gauge("parse_pool.queue_depth", self._queued)
+        metrics.set_gauge("parse_pool.busy", self._busy)
+
+    async def run(self, fn: Callable, html, *args):
+        """
+        fn(html, *args) in a worker process, or in a thread for small pages / when the pool is off.
+        fn must be a module-level function and its arguments and result picklable.
+        """
+        if self.workers <= 0 or self._is_small(html):
+            metrics.incr("parse_pool.inline")
+            return await asyncio.to_thread(fn, html, *args)
+
+        self.start()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+
+        queued_at = time.perf_counter()
+        self._queued += 1
+        self._gauges()
+        try:
+            await self._slots.acquire()
+        finally:
+            self._queued -= 1
+        started = time.perf_counter()
+        metrics.observe("parse_pool.wait_ms", (started - queued_at) * 1000)
+        self._busy += 1
+        self._gauges()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, fn, html, *args)
+            metrics.incr("parse_pool.offloaded")
+            metrics.observe("parse_pool.parse_ms", (time.perf_counter() - started) * 1000)
+            return result
+        except BrokenProcessPool as e:
+            # A worker died (OOM kill, segfault in a parser) - rebuild the pool, parse this page here
+            print(f"[ERROR] Parse pool broken, restarting it: {e}")
+            metrics.incr("parse_pool.restarts")
+            self.stop()
+            return await asyncio.to_thread(fn, html, *args)
+        finally:
+            self._busy -= 1
+            self._slots.release()
+            self._gauges()
+
+
+parse_pool = ParsePool(PARSE_POOL_WORKERS, PARSE_POOL_MAX_TASKS_PER_CHILD, PARSE_POOL_MIN_BYTES)
@@ -1,16 +1,33 @@
 import redis
+import redis.asyncio as aioredis
 import numpy as np
 from typing import List, Tuple, Dict, Any, Optional
-from core.config import REDIS_URL
+from core.config import REDIS_URL, PAGE_CACHE_MAX_URLS, PAGE_TTL_SECONDS, PAGE_META_RETENTION_SECONDS, CHAT_HISTORY_MAX_MESSAGES, SESSION_CACHE_TTL_SECONDS
+from helpers.vector_index import VectorIndex, PageChunkCache
 import hashlib
 import json
+import time
 from datetime import datetime
 
 VECTOR_DIM = 384  # embedding dimension
 
-# Connect to Redis
+# Connect to Redis: async client for the request path, sync client for worker threads
+async_r = aioredis.Redis.from_url(REDIS_URL, decode_responses=False)
 r = redis.Redis.from_url(REDIS_URL, decode_responses=False)
 
+# All doc:* product embeddings as one contiguous matrix, loaded lazily from Redis
+product_index = VectorIndex(VECTOR_DIM)
+INDEX_LOAD_BATCH = 1000
+# Every doc:* store or delete is logged to this stream, so each worker can replay exactly
+# the documents that changed since its last sync - even when the document count doesn't move
+DOC_CHANGES_KEY = "doc_keys:changes"
+DOC_CHANGES_MAXLEN = 10000
+# Stream id of the last change applied to product_index (None: never loaded)
+_product_index_synced = {"last_change": None}
+
+# Chunk texts + embedding matrix per page, so follow-up questions skip Redis
+page_chunk_cache = PageChunkCache(PAGE_CACHE_MAX_URLS)
+
 
 # Create a simple index (no RediSearch needed - just for compatibility)
 def create_redis_index():
@@ -29,99 +46,203 @@ def create_redis_index():
 
 
 #  Store a vector embedding for a URL
-def store_vector(url: str, embedding: List[float]):
+async def store_vector(url: str, embedding: List[float]):
     """Store a document URL with its vector embedding in Redis."""
-    if len(embedding) != VECTOR_DIM:
-        raise ValueError(f"Embedding dimension mismatch. Expected {VECTOR_DIM}, got {len(embedding)}")
-    
-    # Create a unique hash for the URL
-    url_hash = hashlib.md5(url.encode()).hexdigest()
-    key = f"doc:{url_hash}"
-    
-    # Convert embedding to bytes
-    emb_array = np.array(embedding, dtype=np.float32).tobytes()
+    result = await store_vectors([url], [embedding])
+    if result["status"] == "success":
+        result["message"] = f"Stored vector for {url}"
+    return result
+
+
+#  Store many URL embeddings in one round trip
+async def store_vectors(urls: List[str], embeddings: List[List[float]]):
+    """
+    Store document URLs with their vector embeddings in Redis using a single pipeline.
+
+    Args:
+        urls: Document URLs
+        embeddings: One embedding per URL
+
+    Returns:
+        {"status", "message", "stored"}
+    """
+    if len(urls) != len(embeddings):
+        raise ValueError(f"Got {len(urls)} URLs but {len(embeddings)} embeddings")
+    for embedding in embeddings:
+        if len(embedding) != VECTOR_DIM:
+            raise ValueError(f"Embedding dimension mismatch. Expected {VECTOR_DIM}, got {len(embedding)}")
+    if not urls:
+        return {"status": "success", "message": "No vectors to store", "stored": 0}
+
+    # One unique key per URL
+    keys = [f"doc:{hashlib.md5(url.encode()).hexdigest()}" for url in urls]
+    vectors = np.asarray(embeddings, dtype=np.float32)
 
     try:
-        # Store the document
-        r.hset(key, mapping={
-            "url": url,
-            "embedding": emb_array
-        })
-        
+        pipe = async_r.pipeline(transaction=False)
+        for key, url, vector in zip(keys, urls, vectors):
+            # Store the document
+            pipe.hset(key, mapping={
+                "url": url,
+                "embedding": vector.tobytes()
+            })
         # Add to the set of all documents for easy retrieval
-        r.sadd("doc_keys", key)
-        
-        return {"status": "success", "message": f"Stored vector for {url}"}
+        pipe.sadd("doc_keys", *keys)
+        for key in keys:
+            pipe.xadd(DOC_CHANGES_KEY, {"key": key, "op": "store"}, maxlen=DOC_CHANGES_MAXLEN, approximate=True)
+        await pipe.execute()
+
+        # Keep the in-memory matrix fresh without a reload
+        product_index.add_many(keys, list(urls), vectors)
+
+        return {"status": "success", "message": f"Stored {len(urls)} vectors", "stored": len(urls)}
+    except Exception as e:
+        return {"status": "error", "message": f"Failed to store vectors: {str(e)}", "stored": 0}
+
+
+#  Delete product documents
+async def delete_vectors(urls: List[str]) -> Dict[str, Any]:
+    """
+    Remove document URLs and their embeddings from Redis, this worker's product index and,
+    through the change stream, every other worker's.
+
+    Returns:
+        {"status", "message", "deleted"}
+    """
+    keys = [f"doc:{hashlib.md5(url.encode()).hexdigest()}" for url in urls]
+    if not keys:
+        return {"status": "success", "message": "No vectors to delete", "deleted": 0}
+    try:
+        pipe = async_r.pipeline(transaction=False)
+        pipe.delete(*keys)
+        pipe.srem("doc_keys", *keys)
+        for key in keys:
+            pipe.xadd(DOC_CHANGES_KEY, {"key": key, "op": "delete"}, maxlen=DOC_CHANGES_MAXLEN, approximate=True)
+        deleted, *_ = await pipe.execute()
+        product_index.remove_many(keys)
+        return {"status": "success", "message": f"Deleted {deleted} vectors", "deleted": deleted}
     except Exception as e:
-        return {"status": "error", "message": f"Failed to store vector: {str(e)}"}
+        return {"status": "error", "message": f"Failed to delete vectors: {str(e)}", "deleted": 0}
+
+
+async def _load_documents(keys: List[str]) -> int:
+    """
+    (Re)load doc:* hashes into product_index; keys whose hash is gone are removed from it.
+
+    Returns:
+        Number of documents loaded
+    """
+    loaded = 0
+    for start in range(0, len(keys), INDEX_LOAD_BATCH):
+        batch = keys[start:start + INDEX_LOAD_BATCH]
+        pipe = async_r.pipeline(transaction=False)
+        for key in batch:
+            pipe.hmget(key, "url", "embedding")
+        rows = await pipe.execute()
+
+        found, urls, vectors, gone = [], [], [], []
+        for key, (url, emb_bytes) in zip(batch, rows):
+            if not url or not emb_bytes:
+                gone.append(key)
+                continue
+            vector = np.frombuffer(emb_bytes, dtype=np.float32)
+            if vector.shape[0] != VECTOR_DIM:
+                print(f"[WARNING] Skipping document {key} with dimension {vector.shape[0]}")
+                gone.append(key)
+                continue
+            found.append(key)
+            urls.append(url.decode('utf-8') if isinstance(url, bytes) else url)
+            vectors.append(vector)
+
+        if found:
+            product_index.add_many(found, urls, np.vstack(vectors))
+        if gone:
+            product_index.remove_many(gone)
+        loaded += len(found)
+    return loaded
+
+
+def _decode(value) -> str:
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def _stream_id(value) -> Tuple[int, int]:
+    milliseconds, _, sequence = _decode(value).partition("-")
+    return int(milliseconds), int(sequence or 0)
+
+
+# Bring the in-memory product index in line with Redis
+async def sync_product_index() -> int:
+    """
+    Apply the doc:* stores and deletes other workers made since the last sync, by replaying
+    the DOC_CHANGES_KEY stream. Rows written by this process are already in product_index.
+
+    The doc_keys set is reconciled key by key (missing documents loaded, vanished ones
+    removed) on first use, when the stream was trimmed past our position, and when its
+    size disagrees with the index, e.g. after documents were edited outside this module.
+
+    Returns:
+        Number of documents in the index
+    """
+    last_change = _product_index_synced["last_change"]
+    trimmed = False
+    if last_change is not None:
+        changes = await async_r.xrange(DOC_CHANGES_KEY, min=f"({last_change}", max="+")
+        if changes:
+            oldest = await async_r.xrange(DOC_CHANGES_KEY, min="-", max="+", count=1)
+            # Our last entry is gone, so entries after it may have been trimmed away too.
+            # "0-0" means the stream was empty then - everything since is there unless it overflowed.
+            trimmed = _stream_id(oldest[0][0]) > _stream_id(last_change) and (
+                last_change != "0-0" or await async_r.xlen(DOC_CHANGES_KEY) >= DOC_CHANGES_MAXLEN
+            )
+        if changes and not trimmed:
+            changed = list(dict.fromkeys(_decode(fields[b"key"]) for _, fields in changes))
+            await _load_documents(changed)
+            _product_index_synced["last_change"] = _decode(changes[-1][0])
+            print(f"[LOG] Applied {len(changes)} product index changes ({len(changed)} documents)")
+        if not trimmed and await async_r.scard("doc_keys") == len(product_index):
+            return len(product_index)
+
+    # Position in the stream before reading the set, so nothing written meanwhile is skipped
+    latest = await async_r.xrevrange(DOC_CHANGES_KEY, max="+", min="-", count=1)
+    doc_keys = {_decode(key) for key in await async_r.smembers("doc_keys")}
+
+    stale = [key for key in product_index.keys() if key not in doc_keys]
+    if stale:
+        product_index.remove_many(stale)
+    # Changes we missed may include overwrites of documents we already hold - reload them all
+    reload = list(doc_keys) if trimmed else [key for key in doc_keys if key not in product_index]
+    print(f"[LOG] Reconciling product index: {len(stale)} removed, loading {len(reload)} documents")
+    await _load_documents(reload)
+    _product_index_synced["last_change"] = _decode(latest[0][0]) if latest else "0-0"
+    return len(product_index)
 
 
 # Search for similar URLs based on a query embedding
-def search_similar(query_embedding: List[float], top_k: int = 5) -> List[Tuple[str, float]]:
+async def search_similar(query_embedding: List[float], top_k: int = 5) -> List[Tuple[str, float]]:
     """
     Search for similar documents using cosine similarity.
-    This implementation doesn't require RediSearch - it manually computes similarities.
+    This implementation doesn't require RediSearch - it scores the query against
+    the in-memory product index with a single matrix-vector multiply.
     """
     if len(query_embedding) != VECTOR_DIM:
         raise ValueError(f"Query embedding dimension mismatch. Expected {VECTOR_DIM}, got {len(query_embedding)}")
 
     try:
-        # Get all document keys
-        doc_keys = r.smembers("doc_keys")
+        doc_count = await sync_product_index()
         
-        if not doc_keys:
+        if not doc_count:
             print("[WARNING] No documents found in Redis")
             return []
         
-        print(f"[LOG] Searching through {len(doc_keys)} documents")
-        
-        query_vector = np.array(query_embedding, dtype=np.float32)
-        query_norm = np.linalg.norm(query_vector)
-        
-        similarities = []
-        
-        # Calculate cosine similarity for each document
-        for key in doc_keys:
-            try:
-                # Decode key if it's bytes
-                if isinstance(key, bytes):
-                    key = key.decode('utf-8')
-                
-                # Get the embedding and URL
-                doc_data = r.hgetall(key)
-                
-                if not doc_data or b'embedding' not in doc_data:
-                    continue
-                
-                # Extract embedding
-                emb_bytes = doc_data[b'embedding']
-                doc_vector = np.frombuffer(emb_bytes, dtype=np.float32)
-                
-                # Extract URL
-                url = doc_data[b'url'].decode('utf-8') if isinstance(doc_data[b'url'], bytes) else doc_data[b'url']
-                
-                # Calculate cosine similarity
-                doc_norm = np.linalg.norm(doc_vector)
-                
-                if doc_norm == 0 or query_norm == 0:
-                    similarity = 0.0
-                else:
-                    similarity = np.dot(query_vector, doc_vector) / (query_norm * doc_norm)
-                
-                similarities.append((url, float(similarity)))
-                
-            except Exception as e:
-                print(f"[WARNING] Error processing document {key}: {e}")
-                continue
+        print(f"[LOG] Searching through {doc_count} documents")
         
-        # Sort by similarity (highest first) and return top_k
-        similarities.sort(key=lambda x: x[1], reverse=True)
+        similarities = product_index.search(query_embedding, top_k)
         
-        print(f"[LOG] Found {len(similarities)} valid similarities")
         if similarities:
             print(f"[LOG] Top similarity score: {similarities[0][1]:.4f}")
         
-        return similarities[:top_k]
+        return similarities
     
     except Exception as e:
         print(f"[ERROR] Search failed: {e}")
@@ -131,7 +252,7 @@ def search_similar(query_embedding: List[float], top_k: int = 5) -> List[Tuple[s
 
 
 # Store page vector data (content chunks with embeddings)
-def store_page_vector(url: str, content: str, embedding: List[float]):
+async def store_page_vector(url: str, content: str, embedding: List[float]):
     """
     Store page content with its vector embedding.
     Multiple chunks can be stored for the same URL.
@@ -157,28 +278,76 @@ def store_page_vector(url: str, content: str, embedding: List[float]):
         # Convert embedding to bytes
         emb_array = np.array(embedding, dtype=np.float32).tobytes()
         
+        pipe = async_r.pipeline(transaction=False)
         # Store the page content chunk
-        r.hset(chunk_key, mapping={
+        pipe.hset(chunk_key, mapping={
             "url": url,
             "content": content,
             "embedding": emb_array
         })
         
         # Add to the set of all page chunks
-        r.sadd("page_keys", chunk_key)
+        pipe.sadd("page_keys", chunk_key)
         
         # Also track which chunks belong to this URL
-        r.sadd(f"url_chunks:{url_hash}", chunk_key)
+        pipe.sadd(f"url_chunks:{url_hash}", chunk_key)
+        await pipe.execute()
+
+        # Extend the cached chunk matrix for this page, if we hold one
+        page_chunk_cache.extend(url_hash, chunk_key, content, embedding)
         
         return {"status": "success", "message": f"Stored page vector for {url}"}
     except Exception as e:
         return {"status": "error", "message": f"Failed to store page vector: {str(e)}"}
 
 
+# Load every chunk of a page into a VectorIndex
+async def load_page_chunks(url_hash: str) -> Optional[VectorIndex]:
+    """
+    Read all page:{url_hash}:* chunks with one pipelined round trip and stack
+    them into a pre-normalized matrix.
+
+    Args:
+        url_hash: md5 hex digest of the page URL
+        
+    Returns:
+        VectorIndex labelled with chunk contents, or None if the page has no chunks
+    """
+    chunk_keys = [key.decode('utf-8') if isinstance(key, bytes) else key for key in await async_r.smembers(f"url_chunks:{url_hash}")]
+    if not chunk_keys:
+        return None
+
+    pipe = async_r.pipeline(transaction=False)
+    for key in chunk_keys:
+        pipe.hmget(key, "content", "embedding")
+    rows = await pipe.execute()
+
+    keys, contents, vectors = [], [], []
+    for key, (content, emb_bytes) in zip(chunk_keys, rows):
+        if not content or not emb_bytes:
+            continue
+        vector = np.frombuffer(emb_bytes, dtype=np.float32)
+        if vector.shape[0] != VECTOR_DIM:
+            print(f"[WARNING] Skipping chunk {key} with dimension {vector.shape[0]}")
+            continue
+        keys.append(key)
+        contents.append(content.decode('utf-8') if isinstance(content, bytes) else content)
+        vectors.append(vector)
+
+    if not keys:
+        return None
+
+    index = VectorIndex(VECTOR_DIM, initial_capacity=len(keys))
+    index.add_many(keys, contents, np.vstack(vectors))
+    return index
+
+
 # Get relevant content for a URL based on query embedding
-def get_relevant_content(url: str, query_embedding: List[float], top_k: int = 3) -> List[Tuple[str, float]]:
+async def get_relevant_content(url: str, query_embedding: List[float], top_k: int = 3) -> List[Tuple[str, float]]:
     """
     Get the most relevant content chunks for a specific URL based on query similarity.
+    Pages are served from page_chunk_cache when possible and loaded from Redis otherwise;
+    a cached page whose page_meta fingerprint changed since it was loaded is reloaded.
     
     Args:
         url: The page URL to search within
@@ -192,63 +361,29 @@ def get_relevant_content(url: str, query_embedding: List[float], top_k: int = 3)
         raise ValueError(f"Query embedding dimension mismatch. Expected {VECTOR_DIM}, got {len(query_embedding)}")
     
     try:
-        # Get all chunks for this URL
         url_hash = hashlib.md5(url.encode()).hexdigest()
-        chunk_keys = r.smembers(f"url_chunks:{url_hash}")
-        
-        if not chunk_keys:
-            print(f"[WARNING] No content chunks found for URL: {url}")
-            return []
-        
-        print(f"[LOG] Searching through {len(chunk_keys)} content chunks for {url}")
-        
-        query_vector = np.array(query_embedding, dtype=np.float32)
-        query_norm = np.linalg.norm(query_vector)
-        
-        similarities = []
-        
-        # Calculate cosine similarity for each chunk
-        for key in chunk_keys:
-            try:
-                # Decode key if it's bytes
-                if isinstance(key, bytes):
-                    key = key.decode('utf-8')
-                
-                # Get the chunk data
-                chunk_data = r.hgetall(key)
-                
-                if not chunk_data or b'embedding' not in chunk_data or b'content' not in chunk_data:
-                    continue
-                
-                # Extract embedding
-                emb_bytes = chunk_data[b'embedding']
-                chunk_vector = np.frombuffer(emb_bytes, dtype=np.float32)
-                
-                # Extract content
-                content = chunk_data[b'content'].decode('utf-8') if isinstance(chunk_data[b'content'], bytes) else chunk_data[b'content']
-                
-                # Calculate cosine similarity
-                chunk_norm = np.linalg.norm(chunk_vector)
-                
-                if chunk_norm == 0 or query_norm == 0:
-                    similarity = 0.0
-                else:
-                    similarity = np.dot(query_vector, chunk_vector) / (query_norm * chunk_norm)
-                
-                similarities.append((content, float(similarity)))
-                
-            except Exception as e:
-                print(f"[WARNING] Error processing chunk {key}: {e}")
-                continue
+        # Read the fingerprint before the chunks: if the page is re-indexed in between,
+        # the entry is tagged with the old fingerprint and reloaded on the next lookup
+        version = await async_r.hget(f"page_meta:{url_hash}", "fingerprint")
+        version = version.decode('utf-8') if isinstance(version, bytes) else version
+        index = page_chunk_cache.get(url_hash, version)
+        
+        if index is None:
+            index = await load_page_chunks(url_hash)
+            if index is None:
+                print(f"[WARNING] No content chunks found for URL: {url}")
+                return []
+            page_chunk_cache.put(url_hash, index, version)
+            print(f"[LOG] Loaded {len(index)} content chunks for {url}")
+        else:
+            print(f"[LOG] Using {len(index)} cached content chunks for {url}")
         
-        # Sort by similarity (highest first) and return top_k
-        similarities.sort(key=lambda x: x[1], reverse=True)
+        similarities = index.search(query_embedding, top_k)
         
-        print(f"[LOG] Found {len(similarities)} valid content chunks")
         if similarities:
             print(f"[LOG] Top similarity score: {similarities[0][1]:.4f}")
         
-        return similarities[:top_k]
+        return similarities
     
     except Exception as e:
         print(f"[ERROR] Failed to get relevant content: {e}")
@@ -257,30 +392,214 @@ def get_relevant_content(url: str, query_embedding: List[float], top_k: int = 3)
         return []
 
 
+# Fingerprint scraped page content
+def page_fingerprint(chunks: List[str]) -> str:
+    """Content fingerprint of a scraped page, used to detect whether a re-scrape changed anything."""
+    return hashlib.md5("\n".join(chunks).encode()).hexdigest()
+
+
+# Get page freshness metadata
+async def get_page_meta(url: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the freshness record for a page.
+    
+    Args:
+        url: The page URL
+        
+    Returns:
+        Dict with scraped_at, fingerprint, chunk_count, ttl, indexed_chunks and fresh,
+        or None if the page was never indexed (or its metadata expired)
+    """
+    try:
+        url_hash = hashlib.md5(url.encode()).hexdigest()
+        pipe = async_r.pipeline(transaction=False)
+        pipe.hgetall(f"page_meta:{url_hash}")
+        pipe.scard(f"url_chunks:{url_hash}")
+        meta, indexed_chunks = await pipe.execute()
+        
+        if not meta:
+            return None
+        
+        meta = {k.decode('utf-8'): v.decode('utf-8') for k, v in meta.items()}
+        record = {
+            "scraped_at": float(meta.get("scraped_at", 0)),
+            "fingerprint": meta.get("fingerprint"),
+            "chunk_count": int(meta.get("chunk_count", 0)),
+            "ttl": int(meta.get("ttl", PAGE_TTL_SECONDS)),
+            "indexed_chunks": indexed_chunks,
+        }
+        # Fresh means: inside its TTL and every chunk from the last scrape is still in Redis
+        record["fresh"] = (
+            time.time() - record["scraped_at"] < record["ttl"]
+            and record["chunk_count"] > 0
+            and indexed_chunks >= record["chunk_count"]
+        )
+        return record
+    
+    except Exception as e:
+        print(f"[ERROR] Failed to get page metadata: {e}")
+        return None
+
+
+# Store page freshness metadata
+async def store_page_meta(url: str, fingerprint: str, chunk_count: int, ttl: int = PAGE_TTL_SECONDS) -> Dict[str, Any]:
+    """
+    Record that a page was just scraped and indexed.
+    
+    Args:
+        url: The page URL
+        fingerprint: page_fingerprint() of the scraped chunks
+        chunk_count: Number of chunks stored for the page
+        ttl: Seconds the page stays fresh
+        
+    Returns:
+        Dict with status and message
+    """
+    try:
+        url_hash = hashlib.md5(url.encode()).hexdigest()
+        key = f"page_meta:{url_hash}"
+        pipe = async_r.pipeline(transaction=False)
+        pipe.hset(key, mapping={
+            "url": url,
+            "scraped_at": time.time(),
+            "fingerprint": fingerprint,
+            "chunk_count": chunk_count,
+            "ttl": ttl
+        })
+        # Keep the record past its TTL so an unchanged re-scrape can skip re-embedding
+        pipe.expire(key, max(ttl, PAGE_META_RETENTION_SECONDS))
+        await pipe.execute()
+        return {"status": "success", "message": f"Stored page metadata for {url}"}
+    except Exception as e:
+        return {"status": "error", "message": f"Failed to store page metadata: {str(e)}"}
+
+
+# Delete all stored chunks of a page
+async def delete_page_vectors(url: str) -> Dict[str, Any]:
+    """
+    Remove every chunk stored for a page, e.g. before re-indexing changed content.
+    
+    Args:
+        url: The page URL
+        
+    Returns:
+        Dict with status and message
+    """
+    try:
+        url_hash = hashlib.md5(url.encode()).hexdigest()
+        chunk_keys = list(await async_r.smembers(f"url_chunks:{url_hash}"))
+        
+        pipe = async_r.pipeline(transaction=False)
+        if chunk_keys:
+            pipe.delete(*chunk_keys)
+            pipe.srem("page_keys", *chunk_keys)
+        pipe.delete(f"url_chunks:{url_hash}")
+        await pipe.execute()
+        
+        page_chunk_cache.invalidate(url_hash)
+        print(f"[LOG] Deleted {len(chunk_keys)} chunks for {url}")
+        return {"status": "success", "message": f"Deleted {len(chunk_keys)} chunks for {url}"}
+    except Exception as e:
+        return {"status": "error", "message": f"Failed to delete page vectors: {str(e)}"}
+
+
+# Chat history is a Redis LIST of JSON messages at chat:{session_id}:messages, oldest first.
+# Older deployments stored the whole history as one JSON string under the same key; those
+# are converted on first access (or in bulk with migrate_all_chat_histories).
+def _chat_key(session_id: str) -> str:
+    return f"chat:{session_id}:messages"
+
+
+def _is_wrongtype(error: Exception) -> bool:
+    # Errors raised from a pipeline wrap the server message, so don't anchor the match
+    return isinstance(error, redis.exceptions.ResponseError) and "WRONGTYPE" in str(error)
+
+
+# Convert a legacy JSON-blob chat history into a list
+async def migrate_chat_history(session_id: str) -> Dict[str, Any]:
+    """
+    Rewrite a session's JSON-string chat history as a Redis list, atomically.
+    
+    Args:
+        session_id: The session identifier
+        
+    Returns:
+        Dict with status and message
+    """
+    key = _chat_key(session_id)
+    try:
+        async with async_r.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    if await pipe.type(key) != b"string":
+                        await pipe.unwatch()
+                        return {"status": "skipped", "message": f"Chat history for {session_id} is not a legacy blob"}
+                    messages = json.loads(await pipe.get(key))
+                    pipe.multi()
+                    pipe.delete(key)
+                    if messages:
+                        pipe.rpush(key, *[json.dumps(msg) for msg in messages])
+                        pipe.ltrim(key, -CHAT_HISTORY_MAX_MESSAGES, -1)
+                    await pipe.execute()
+                    print(f"[LOG] Migrated {len(messages)} chat messages for session {session_id} to a list")
+                    return {"status": "success", "message": f"Migrated {len(messages)} messages"}
+                except redis.exceptions.WatchError:
+                    continue  # Someone else touched the key - look again
+    except Exception as e:
+        print(f"[ERROR] Failed to migrate chat history: {e}")
+        return {"status": "error", "message": f"Failed to migrate chat history: {str(e)}"}
+
+
+async def migrate_all_chat_histories(scan_count: int = 500) -> Dict[str, Any]:
+    """
+    Convert every legacy chat history blob in Redis. Safe to run while the app is serving.
+    
+    Returns:
+        Dict with status, message and counts
+    """
+    migrated = 0
+    failed = 0
+    async for key in async_r.scan_iter(match="chat:*:messages", count=scan_count):
+        if await async_r.type(key) != b"string":
+            continue
+        session_id = key.decode("utf-8")[len("chat:"):-len(":messages")]
+        result = await migrate_chat_history(session_id)
+        if result["status"] == "success":
+            migrated += 1
+        elif result["status"] == "error":
+            failed += 1
+    return {"status": "success" if not failed else "error", "message": f"Migrated {migrated} sessions, {failed} failed", "migrated": migrated, "failed": failed}
+
+
 # Get chat history based on session_id
-def get_chat_history(session_id: str) -> List[Dict[str, Any]]:
+async def get_chat_history(session_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     Get chat history for a session.
     
     Args:
         session_id: The session identifier
+        limit: Only return the last `limit` messages (all stored messages if None)
         
     Returns:
-        List of message dictionaries (empty list if not found)
+        List of message dictionaries, oldest first (empty list if not found)
     """
+    key = _chat_key(session_id)
+    start = -limit if limit else 0
     try:
-        key = f"chat:{session_id}:messages"
-        messages_json = r.get(key)
-        
-        if not messages_json:
+        try:
+            raw_messages = await async_r.lrange(key, start, -1)
+        except redis.exceptions.ResponseError as e:
+            if not _is_wrongtype(e):
+                raise
+            await migrate_chat_history(session_id)
+            raw_messages = await async_r.lrange(key, start, -1)
+        
+        if not raw_messages:
             print(f"[INFO] No chat history found for session: {session_id} (starting fresh)")
             return []
         
-        # Decode if bytes
-        if isinstance(messages_json, bytes):
-            messages_json = messages_json.decode('utf-8')
-        
-        messages = json.loads(messages_json)
+        messages = [json.loads(raw) for raw in raw_messages]
         print(f"[LOG] Retrieved {len(messages)} messages for session {session_id}")
         return messages
     
@@ -289,8 +608,34 @@ def get_chat_history(session_id: str) -> List[Dict[str, Any]]:
         return []
 
 
+# Get a slice of chat history by list position
+async def get_chat_history_range(session_id: str, start: int, stop: int) -> List[Dict[str, Any]]:
+    """
+    Messages at positions start..stop (inclusive, 0 = oldest stored message) of a session's history.
+
+    Returns:
+        List of message dictionaries, oldest first (empty list on error)
+    """
+    try:
+        raw_messages = await async_r.lrange(_chat_key(session_id), start, stop)
+        return [json.loads(raw) for raw in raw_messages]
+    except Exception as e:
+        print(f"[ERROR] Failed to get chat history range: {e}")
+        return []
+
+
+# Count stored chat messages
+async def get_chat_history_length(session_id: str) -> int:
+    """Number of messages in the session's Redis chat history (0 if none or on error)."""
+    try:
+        return await async_r.llen(_chat_key(session_id))
+    except Exception as e:
+        print(f"[ERROR] Failed to get chat history length: {e}")
+        return 0
+
+
 # Delete chat history based on session_id
-def delete_chat_history(session_id: str) -> Dict[str, Any]:
+async def delete_chat_history(session_id: str) -> Dict[str, Any]:
     """
     Delete chat history for a session.
     
@@ -301,12 +646,12 @@ def delete_chat_history(session_id: str) -> Dict[str, Any]:
         Dict with status and message
     """
     try:
-        key = f"chat:{session_id}:messages"
+        key = _chat_key(session_id)
         session_key = f"chat:{session_id}:last_activity"
         
         # Delete both the messages and last activity keys
-        deleted_messages = r.delete(key)
-        deleted_activity = r.delete(session_key)
+        deleted_messages = await async_r.delete(key)
+        deleted_activity = await async_r.delete(session_key)
         
         if deleted_messages or deleted_activity:
             print(f"[LOG] Deleted chat history for session {session_id}")
@@ -320,9 +665,9 @@ def delete_chat_history(session_id: str) -> Dict[str, Any]:
         return {"status": "error", "message": f"Failed to delete chat history: {str(e)}"}
 
 # Store chat history based on session_id
-def store_chat_history(session_id: str, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+async def store_chat_history(session_id: str, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
-    Store complete chat history for a session.
+    Replace the complete chat history for a session.
     
     Args:
         session_id: The session identifier
@@ -341,14 +686,15 @@ def store_chat_history(session_id: str, messages: List[Dict[str, Any]]) -> Dict[
             if "created_at" not in msg or not msg["created_at"]:
                 msg["created_at"] = datetime.utcnow().isoformat()
         
-        key = f"chat:{session_id}:messages"
-        messages_json = json.dumps(messages)
-        
-        r.set(key, messages_json)
-        
+        key = _chat_key(session_id)
+        pipe = async_r.pipeline(transaction=True)
+        pipe.delete(key)
+        if messages:
+            pipe.rpush(key, *[json.dumps(msg) for msg in messages])
+            pipe.ltrim(key, -CHAT_HISTORY_MAX_MESSAGES, -1)
         # Update session last activity
-        session_key = f"chat:{session_id}:last_activity"
-        r.set(session_key, datetime.utcnow().isoformat())
+        pipe.set(f"chat:{session_id}:last_activity", datetime.utcnow().isoformat())
+        await pipe.execute()
         
         print(f"[LOG] Stored {len(messages)} messages for session {session_id}")
         return {"status": "success", "message": f"Stored {len(messages)} messages", "session_id": session_id}
@@ -359,7 +705,7 @@ def store_chat_history(session_id: str, messages: List[Dict[str, Any]]) -> Dict[
 
 
 # Add a message to chat
-def add_message_to_chat(
+async def add_message_to_chat(
     session_id: str,
     message: str,
     message_type: str,
@@ -377,32 +723,123 @@ def add_message_to_chat(
     Returns:
         Dict with status, message, and the added message object
     """
-    try:
-        # Validate message_type
-        if message_type not in ["user", "assistant", "system"]:
-            return {"status": "error", "message": f"Invalid message_type: {message_type}. Must be user/assistant/system"}
-        
-        # Get existing messages (returns empty list if none found)
-        messages = get_chat_history(session_id)
-        
-        # Create new message
-        new_message = {
-            "message": message,
-            "message_type": message_type,
-            "detected_intent": detected_intent,
-            "created_at": datetime.utcnow().isoformat()
-        }
+    # Validate message_type
+    if message_type not in ["user", "assistant", "system"]:
+        return {"status": "error", "message": f"Invalid message_type: {message_type}. Must be user/assistant/system"}
+    
+    # Create new message
+    new_message = {
+        "message": message,
+        "message_type": message_type,
+        "detected_intent": detected_intent,
+        "created_at": datetime.utcnow().isoformat()
+    }
+    
+    result = await add_messages_to_chat(session_id, [new_message])
+    if result["status"] == "success":
+        print(f"[LOG] Added {message_type} message to session {session_id}")
+        return {"status": "success", "message": "Message added", "added_message": new_message}
+    return result
+
+
+# Add several messages to chat at once
+async def add_messages_to_chat(session_id: str, new_messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Append messages to a session's chat history: one RPUSH, capped at
+    CHAT_HISTORY_MAX_MESSAGES with LTRIM, independent of the history's length.
+    
+    Args:
+        session_id: The session identifier
+        new_messages: Message dictionaries (message, message_type, detected_intent, created_at)
         
-        # Append and save
-        messages.append(new_message)
-        result = store_chat_history(session_id, messages)
+    Returns:
+        Dict with status and message
+    """
+    if not new_messages:
+        return {"status": "success", "message": "Nothing to add"}
+    key = _chat_key(session_id)
+    for attempt in range(2):
+        try:
+            pipe = async_r.pipeline(transaction=True)
+            pipe.rpush(key, *[json.dumps(msg) for msg in new_messages])
+            pipe.ltrim(key, -CHAT_HISTORY_MAX_MESSAGES, -1)
+            pipe.set(f"chat:{session_id}:last_activity", datetime.utcnow().isoformat())
+            await pipe.execute()
+            return {"status": "success", "message": f"Added {len(new_messages)} messages"}
+        except redis.exceptions.ResponseError as e:
+            if attempt == 0 and _is_wrongtype(e):
+                await migrate_chat_history(session_id)
+                continue
+            print(f"[ERROR] Failed to add messages: {e}")
+            return {"status": "error", "message": f"Failed to add messages: {str(e)}"}
+        except Exception as e:
+            print(f"[ERROR] Failed to add messages: {e}")
+            return {"status": "error", "message": f"Failed to add messages: {str(e)}"}
+
+
+# Get cached session metadata
+async def get_cached_session(session_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get a session's metadata (id, user_id, current_url, current_domain, ...) from Redis.
+    
+    Args:
+        session_id: The session identifier
         
-        if result["status"] == "success":
-            print(f"[LOG] Added {message_type} message to session {session_id}")
-            return {"status": "success", "message": "Message added", "added_message": new_message}
-        else:
-            return result
+    Returns:
+        Session dict, or None if it isn't cached
+    """
+    try:
+        key = f"chat:{session_id}:session"
+        pipe = async_r.pipeline(transaction=False)
+        pipe.hgetall(key)
+        pipe.expire(key, SESSION_CACHE_TTL_SECONDS)
+        fields, _ = await pipe.execute()
+        if not fields:
+            return None
+        return {k.decode("utf-8"): json.loads(v) for k, v in fields.items()}
+    except Exception as e:
+        print(f"[ERROR] Failed to get cached session: {e}")
+        return None
+
+
+# Cache session metadata, optionally backfilling the chat history
+async def cache_session(session: Dict[str, Any], messages: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Store a session's metadata in Redis. When `messages` is given (oldest first) and the
+    session has no chat history list, the list is created from it, i.e. backfilled from
+    Postgres. An existing list is left alone: it can hold turns the ChatWriter has appended
+    but not yet written to Postgres, which a backfill would throw away.
     
+    Args:
+        session: Session fields (JSON-serializable, must include id)
+        messages: Full recent chat history, or None to leave the list alone
+        
+    Returns:
+        Dict with status, message and backfilled (whether the list was created from `messages`)
+    """
+    try:
+        session_id = session["id"]
+        key = f"chat:{session_id}:session"
+        messages_key = _chat_key(session_id)
+        async with async_r.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    backfill = False
+                    if messages is not None:
+                        # Checked and written in one transaction, so a concurrent append wins
+                        await pipe.watch(messages_key)
+                        backfill = not await pipe.exists(messages_key)
+                    pipe.multi()
+                    pipe.delete(key)
+                    pipe.hset(key, mapping={field: json.dumps(value) for field, value in session.items()})
+                    pipe.expire(key, SESSION_CACHE_TTL_SECONDS)
+                    if backfill and messages:
+                        pipe.rpush(messages_key, *[json.dumps(msg) for msg in messages[-CHAT_HISTORY_MAX_MESSAGES:]])
+                    await pipe.execute()
+                    break
+                except redis.exceptions.WatchError:
+                    continue  # The history changed while we looked - look again
+        return {"status": "success", "message": f"Cached session {session_id}", "backfilled": backfill}
     except Exception as e:
-        print(f"[ERROR] Failed to add message: {e}")
-        return {"status": "error", "message": f"Failed to add message: {str(e)}"}
\ No newline at end of file
+        print(f"[ERROR] Failed to cache session: {e}")
+        return {"status": "error", "message": f"Failed to cache session: {str(e)}"}
@@ -0,0 +1,191 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+from typing import List, Tuple, Dict, Iterable, Optional
+
+
+class VectorIndex:
+    """
+    In-memory matrix of L2-normalized float32 vectors with a parallel label array.
+
+    Every row is addressed by a unique key (the Redis hash key it was loaded from),
+    so re-storing the same key overwrites its row instead of duplicating it.
+    A search is one matrix-vector multiply plus an argpartition top-k.
+    """
+
+    def __init__(self, dim: int, initial_capacity: int = 1024):
+        self.dim = dim
+        self._matrix = np.zeros((max(initial_capacity, 1), dim), dtype=np.float32)
+        self._labels: List[str] = []
+        self._keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def _normalize(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        # Zero vectors stay zero so they score 0.0, matching the old per-row behaviour
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _grow(self, needed: int):
+        capacity = self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        grown = np.zeros((capacity, self.dim), dtype=np.float32)
+        grown[:len(self._labels)] = self._matrix[:len(self._labels)]
+        self._matrix = grown
+
+    def add(self, key: str, label: str, vector: Iterable[float]):
+        """Insert or overwrite a single row."""
+        self.add_many([key], [label], [vector])
+
+    def add_many(self, keys: List[str], labels: List[str], vectors) -> int:
+        """
+        Insert or overwrite many rows at once.
+
+        Returns:
+            Number of rows in the index after the insert
+        """
+        if not keys:
+            return len(self._labels)
+
+        normalized = self._normalize(vectors)
+        if normalized.shape[0] != len(keys) or len(labels) != len(keys):
+            raise ValueError("keys, labels and vectors must have the same length")
+
+        with self._lock:
+            self._grow(len(self._labels) + len(keys))
+            for key, label, vector in zip(keys, labels, normalized):
+                row = self._rows.get(key)
+                if row is None:
+                    row = len(self._labels)
+                    self._rows[key] = row
+                    self._labels.append(label)
+                    self._keys.append(key)
+                else:
+                    self._labels[row] = label
+                self._matrix[row] = vector
+            return len(self._labels)
+
+    def remove_many(self, keys: Iterable[str]) -> int:
+        """
+        Drop rows by key (unknown keys are ignored). The last row moves into each freed slot,
+        so the matrix stays contiguous.
+
+        Returns:
+            Number of rows in the index after the removal
+        """
+        with self._lock:
+            for key in keys:
+                row = self._rows.pop(key, None)
+                if row is None:
+                    continue
+                last = len(self._labels) - 1
+                if row != last:
+                    self._matrix[row] = self._matrix[last]
+                    self._labels[row] = self._labels[last]
+                    self._keys[row] = self._keys[last]
+                    self._rows[self._keys[row]] = row
+                self._matrix[last] = 0
+                self._labels.pop()
+                self._keys.pop()
+            return len(self._labels)
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._keys)
+
+    def search(self, query_vector: Iterable[float], top_k: int = 5) -> List[Tuple[str, float]]:
+        """
+        Return the top_k (label, cosine_similarity) pairs, highest first.
+        """
+        query = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+        if query.shape[0] != self.dim:
+            raise ValueError(f"Query dimension mismatch. Expected {self.dim}, got {query.shape[0]}")
+
+        query_norm = np.linalg.norm(query)
+        with self._lock:
+            count = len(self._labels)
+            if count == 0 or top_k <= 0 or query_norm == 0:
+                return [(label, 0.0) for label in self._labels[:max(top_k, 0)]]
+
+            scores = self._matrix[:count] @ (query / query_norm)
+            k = min(top_k, count)
+            if k < count:
+                top = np.argpartition(-scores, k - 1)[:k]
+            else:
+                top = np.arange(count)
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [(self._labels[i], float(scores[i])) for i in top]
+
+    def clear(self):
+        with self._lock:
+            self._labels = []
+            self._keys = []
+            self._rows = {}
+            self._matrix = np.zeros_like(self._matrix)
+
+
+class PageChunkCache:
+    """
+    Size-bounded LRU of per-URL chunk indexes, keyed by URL hash.
+
+    Each entry is a VectorIndex whose labels are the chunk texts, so a follow-up
+    question on a cached page is a single in-memory matmul. Entries carry the page's
+    content fingerprint from page_meta; a lookup with a different fingerprint misses,
+    so a page re-indexed by another worker is reloaded instead of served stale.
+    """
+
+    def __init__(self, max_pages: int = 128):
+        self.max_pages = max_pages
+        self._pages: "OrderedDict[str, Tuple[Optional[str], VectorIndex]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def get(self, url_hash: str, version: Optional[str] = None):
+        with self._lock:
+            entry = self._pages.get(url_hash)
+            if entry is None:
+                return None
+            if entry[0] != version:
+                del self._pages[url_hash]
+                return None
+            self._pages.move_to_end(url_hash)
+            return entry[1]
+
+    def put(self, url_hash: str, index: VectorIndex, version: Optional[str] = None):
+        with self._lock:
+            self._pages[url_hash] = (version, index)
+            self._pages.move_to_end(url_hash)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+
+    def extend(self, url_hash: str, key: str, content: str, vector: Iterable[float]) -> bool:
+        """
+        Add a freshly written chunk to a cached page. Pages that are not cached
+        are left alone - they get loaded in full on the next read.
+
+        Returns:
+            True if a cached entry was extended
+        """
+        with self._lock:
+            entry = self._pages.get(url_hash)
+        if entry is None:
+            return False
+        entry[1].add(key, content, vector)
+        return True
+
+    def invalidate(self, url_hash: str):
+        with self._lock:
+            self._pages.pop(url_hash, None)
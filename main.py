@@ -1,11 +1,67 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.requests import Request
-from controllers.query_handler import query_handler
+from fastapi.responses import JSONResponse
+from controllers.query_handler import query_handler, query_stream_handler
+from helpers import metrics
+from helpers.embedder import warm_up
+from helpers.redis_functions import async_r
+from helpers.chat_writer import chat_writer
+from helpers.http_client import aclose_clients
+from helpers.parse_pool import parse_pool
+from core.config import EMBEDDER_WARMUP, CHAT_WRITE_QUEUE_MAX
+from core.database import connect_db, connect_db_with_retry, disconnect_db, db_ready, db_metrics
 from routes.authentication_routes import router as authentication_routes
 from routes.session_routes import router as session_routes
 
-app = FastAPI()
+async def replay_dead_letters(reconnect_task=None):
+    if reconnect_task:
+        await reconnect_task
+    try:
+        # Leave half the queue for live traffic
+        result = await chat_writer.replay_dead_letters(limit=max(CHAT_WRITE_QUEUE_MAX // 2, 1))
+        print(f"[LOG] {result['message']}")
+    except Exception as e:
+        print(f"[ERROR] Failed to replay dead-lettered chat messages: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The embedding model loads lazily; optionally pay for it at startup instead
+    warmup_task = None
+    if EMBEDDER_WARMUP == "blocking":
+        await asyncio.to_thread(warm_up)
+    elif EMBEDDER_WARMUP == "background":
+        warmup_task = asyncio.create_task(asyncio.to_thread(warm_up))
+    # One database client for the whole process; if it's unreachable, start anyway and keep
+    # reconnecting in the background (/ready reports it until then)
+    reconnect_task = None
+    try:
+        await connect_db()
+    except Exception as e:
+        print(f"[ERROR] Database connection failed at startup: {e}")
+        reconnect_task = asyncio.create_task(connect_db_with_retry())
+    await chat_writer.start()
+    # Turns dead-lettered while the database was unreachable (or by a previous process)
+    # get another try once it's connected
+    replay_task = asyncio.create_task(replay_dead_letters(reconnect_task))
+    parse_pool.start()
+    yield
+    if warmup_task and not warmup_task.done():
+        warmup_task.cancel()
+    if reconnect_task and not reconnect_task.done():
+        reconnect_task.cancel()
+    if not replay_task.done():
+        replay_task.cancel()
+    # Flush queued chat messages while Redis and the database are still reachable
+    await chat_writer.stop()
+    await disconnect_db()
+    await aclose_clients()
+    parse_pool.stop()
+    await async_r.aclose()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,9 +76,29 @@ app.add_middleware(
 async def get():
     return {"message": "Hello, World!"}
 
+@app.get("/metrics")
+async def get_metrics():
+    return {**metrics.snapshot(), "database": await db_metrics()}
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 only when the database and Redis both answer."""
+    checks = {"database": await db_ready()}
+    try:
+        await async_r.ping()
+        checks["redis"] = {"status": "ok"}
+    except Exception as e:
+        checks["redis"] = {"status": "error", "error": str(e)}
+    ok = all(check["status"] == "ok" for check in checks.values())
+    return JSONResponse(content={"ready": ok, "checks": checks}, status_code=200 if ok else 503)
+
 @app.post("/query")
 async def query(request: Request):
     return await query_handler(request)
 
+@app.post("/query/stream")
+async def query_stream(request: Request):
+    return await query_stream_handler(request)
+
 app.include_router(authentication_routes, prefix="/auth")
 app.include_router(session_routes, prefix="/sessions")
\ No newline at end of file
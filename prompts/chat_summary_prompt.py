@@ -0,0 +1,27 @@
+def chat_summary_prompt(previous_summary: str, new_messages: str, max_words: int):
+    prompt = f'''You maintain a running summary of a conversation between a shopper and an e-commerce shop assistant.
+
+    # YOUR TASK
+    Update the existing summary with the new messages. Return the complete updated summary.
+
+    # KEEP
+    - Products that were shown, recommended or discussed, with names, prices, sizes, colours and links if mentioned
+    - What the shopper is looking for: budget, preferences, sizes, constraints
+    - Questions the shopper asked and the answers they got
+    - Decisions and actions: items added to cart or wishlist, orders, things the shopper rejected
+
+    # DROP
+    - Greetings, small talk and filler
+    - Repetition of things already in the summary
+
+    # OUTPUT FORMAT
+    Plain text, at most {max_words} words. No JSON, no markdown headings.
+    Write it so the assistant can answer follow-up questions like "what was the second one you showed?" from it.
+
+    # EXISTING SUMMARY
+    {previous_summary or "(empty - this is the start of the conversation)"}
+
+    # NEW MESSAGES
+    {new_messages}
+    '''
+    return prompt
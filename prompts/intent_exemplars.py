@@ -0,0 +1,89 @@
+# Labeled example queries per (intent, scope), used by helpers/intent_classifier to build
+# nearest-centroid classes. Keep them consistent with prompts/intent_detection.py.
+
+intent_exemplars = {
+    ("ask", "current_page"): [
+        "What is this?",
+        "Tell me about this product",
+        "Is this available in blue?",
+        "Give me description of this",
+        "How much does this cost?",
+        "what is the price",
+        "is this in stock",
+        "what's the discount on this",
+        "how many ratings does it have",
+        "what material is this made of",
+        "does this come in size XL",
+        "is cash on delivery available for this",
+        "what is the return policy here",
+        "i want to buy this bag",
+        "should i buy this product?",
+        "is this worth the money",
+        "what are the features of this phone",
+        "when will this be delivered",
+    ],
+    ("ask", "product"): [
+        "Find me red shirts",
+        "Search for running shoes under 2000",
+        "Show me laptops with 16GB RAM",
+        "I'm looking for wireless headphones",
+        "show me similar shoes",
+        "find cheaper alternatives",
+        "I need a black leather wallet",
+        "recommend some formal shirts for men",
+        "search for kurtas for women",
+        "any good smartwatches under 5000",
+        "I want blue jeans for men",
+        "show me other options in this category",
+    ],
+    ("ask", "chat_history"): [
+        "Tell me about those shoes you showed",
+        "What about the shirts you mentioned?",
+        "Compare them",
+        "Are those still available?",
+        "The ones you gave me earlier",
+        "which of the products you suggested is cheapest",
+        "what was the first one you recommended",
+        "remind me what we discussed before",
+        "tell me more about the second option",
+        "how do those compare on price",
+    ],
+    ("todo", "cart"): [
+        "Add this to cart",
+        "Remove item from cart",
+        "Update quantity to 2",
+        "add this to my bag in size medium",
+        "put two of these in the cart",
+        "empty my cart",
+    ],
+    ("todo", "order"): [
+        "Place order",
+        "Cancel order",
+        "Track my order",
+        "where is my order",
+        "return my last order",
+        "buy it now and place the order",
+    ],
+    ("todo", "wishlist"): [
+        "Save for later",
+        "Add to wishlist",
+        "Remove from favorites",
+        "save this to my wishlist",
+        "move this to favourites",
+    ],
+    ("todo", "account"): [
+        "Update my address",
+        "Change password",
+        "View my profile",
+        "change my phone number",
+        "update my email address",
+    ],
+    ("unknown", "unknown"): [
+        "Tell me more",
+        "hmm",
+        "ok",
+        "what",
+        "hello",
+        "can you help",
+    ],
+}
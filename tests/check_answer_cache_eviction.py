@@ -0,0 +1,54 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import hashlib
+import numpy as np
+from core.config import ANSWER_CACHE_MAX_ENTRIES
+from helpers.redis_functions import async_r, store_page_meta, get_page_meta, VECTOR_DIM
+from helpers.answer_cache import store_answer, lookup_answer, get_answer_stats, _cache_key
+
+# Fills the answer cache of a throwaway page on the configured Redis, then checks that a new
+# answer replaces the least hit entry instead of being turned away.
+URL = "https://example.com/answer-cache-eviction-check"
+SCOPE = "current_page"
+
+
+def embedding(seed: int):
+    vector = np.random.default_rng(seed).standard_normal(VECTOR_DIM).astype(np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+async def main():
+    url_hash = hashlib.md5(URL.encode()).hexdigest()
+    # A fresh page needs its indexed chunk too
+    await store_page_meta(URL, "eviction-check", 1, ttl=60)
+    await async_r.sadd(f"url_chunks:{url_hash}", f"page:{url_hash}:check")
+    key = _cache_key("eviction-check", SCOPE)
+    await async_r.delete(key)
+    try:
+        for i in range(ANSWER_CACHE_MAX_ENTRIES):
+            result = await store_answer(URL, SCOPE, f"question {i}", embedding(i), f"answer {i}")
+            assert result["status"] == "success", result
+        # Every entry but the first gets a hit, so "question 0" is the one to go
+        meta = await get_page_meta(URL)
+        for i in range(1, ANSWER_CACHE_MAX_ENTRIES):
+            assert await lookup_answer(URL, SCOPE, embedding(i), meta), f"question {i} not found"
+
+        result = await store_answer(URL, SCOPE, "a brand new question", embedding(10_000), "new answer")
+        assert result["status"] == "success", result
+
+        queries = {item["query"] for item in await get_answer_stats(URL, SCOPE)}
+        assert len(queries) == ANSWER_CACHE_MAX_ENTRIES, f"{len(queries)} entries cached"
+        assert "a brand new question" in queries, "new answer was not cached"
+        assert "question 0" not in queries, "least hit answer was not evicted"
+        # The evicted answer's embedding and hit count went with it
+        assert await async_r.hlen(key) == ANSWER_CACHE_MAX_ENTRIES * 3, "evicted entry left fields behind"
+        print(f"✓ Full cache ({ANSWER_CACHE_MAX_ENTRIES} answers) replaced its least hit answer with the new one")
+    finally:
+        await async_r.delete(key, f"page_meta:{url_hash}", f"url_chunks:{url_hash}")
+        await async_r.aclose()
+
+
+asyncio.run(main())
@@ -0,0 +1,32 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from core.config import EMBEDDING_ONNX_DIR
+from helpers.embedding_backends import create_backend
+from helpers.redis_functions import VECTOR_DIM
+from benchmarks.chunk_corpus import CORPUS
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+# Minimum per-text cosine similarity with the reference backend
+THRESHOLDS = {"onnx": 0.999, "onnx_int8": 0.97}
+
+reference = create_backend("sentence_transformers", MODEL_NAME, EMBEDDING_ONNX_DIR).encode(CORPUS)
+reference_top = np.argsort(-(reference[:8] @ reference[8:].T), axis=1)[:, :5]
+
+failed = False
+for kind, threshold in THRESHOLDS.items():
+    embeddings = create_backend(kind, MODEL_NAME, EMBEDDING_ONNX_DIR).encode(CORPUS)
+    assert embeddings.shape == (len(CORPUS), VECTOR_DIM), f"{kind} returned shape {embeddings.shape}"
+
+    cosine = np.sum(embeddings * reference, axis=1)
+    # Retrieval agreement: does each query still get the same top-5 chunks?
+    top = np.argsort(-(embeddings[:8] @ embeddings[8:].T), axis=1)[:, :5]
+    overlap = np.mean([len(set(a) & set(b)) / 5 for a, b in zip(top, reference_top)])
+
+    ok = cosine.min() >= threshold
+    failed = failed or not ok
+    print(f"{'✓' if ok else '✗'} {kind}: min cosine {cosine.min():.5f}, mean {cosine.mean():.5f}, top-5 overlap {overlap:.2%}")
+
+sys.exit(1 if failed else 0)